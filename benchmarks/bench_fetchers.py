@@ -0,0 +1,124 @@
+"""Benchmark the HTTP fetcher against a fleet of simulated Philips air purifiers.
+
+Prints the results as JSON. Times are in seconds.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import simulator
+from py_air_control_exporter import readings_source
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--timeout", type=float, default=readings_source.DEFAULT_TIMEOUT
+    )
+    parser.add_argument("--engine", choices=readings_source.ENGINES, default="threads")
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="Defaults to standard output.")
+    args = parser.parse_args(argv)
+
+    behavior = simulator.Behavior(
+        latency=args.latency, jitter=args.jitter, drop_rate=args.drop_rate
+    )
+    results = {
+        "parameters": {
+            "count": args.count,
+            "rounds": args.rounds,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "drop_rate": args.drop_rate,
+            "timeout": args.timeout,
+            "engine": args.engine,
+            "max_concurrency": args.max_concurrency,
+        },
+        **bench_fetchers(
+            args.count,
+            behavior,
+            rounds=args.rounds,
+            timeout=args.timeout,
+            engine=args.engine,
+            max_concurrency=args.max_concurrency,
+        ),
+    }
+    output = json.dumps(results, indent=2) + "\n"
+    if args.output is None:
+        sys.stdout.write(output)
+    else:
+        args.output.write_text(output)
+
+
+def bench_fetchers(  # noqa: PLR0913
+    count: int,
+    behavior: simulator.Behavior,
+    *,
+    rounds: int,
+    timeout: float = readings_source.DEFAULT_TIMEOUT,
+    engine: str = "threads",
+    max_concurrency: int | None = None,
+) -> dict:
+    """Fetch readings from `count` simulated devices `rounds` times.
+
+    The first round includes the key exchange with every device, so it is reported
+    separately from the others.
+    """
+    with simulator.BackgroundSimulator(count, behavior) as devices:
+        targets_config = {
+            name: {**target, "timeout": timeout}
+            for name, target in devices.targets_config().items()
+        }
+        source = readings_source.from_config(
+            targets_config, engine=engine, max_concurrency=max_concurrency
+        )
+        assert source is not None
+        try:
+            round_results = [_fetch_round(source, devices) for _ in range(rounds)]
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    first, *rest = round_results
+    rest = rest or [first]
+    durations = [result["seconds"] for result in rest]
+    return {
+        "first_round": first,
+        "seconds": {
+            "min": min(durations),
+            "median": statistics.median(durations),
+            "max": max(durations),
+        },
+        "readings_per_second": count / statistics.median(durations),
+        "handshakes_per_round": statistics.mean(r["handshakes"] for r in rest),
+        "requests_per_round": statistics.mean(r["requests"] for r in rest),
+        "errors_per_round": statistics.mean(r["errors"] for r in rest),
+    }
+
+
+def _fetch_round(
+    source: readings_source.ReadingsSource, devices: simulator.Simulator
+) -> dict:
+    before = devices.totals()
+    start = time.perf_counter()
+    readings = source()
+    seconds = time.perf_counter() - start
+    after = devices.totals()
+    return {
+        "seconds": seconds,
+        "errors": sum(reading.has_errors for reading in readings.values()),
+        **{counter: after[counter] - before[counter] for counter in after},
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Benchmark the scrape path for synthetic fleets of air purifiers.
+
+Prints the results as JSON. Times are in seconds, memory is in bytes.
+"""
+
+import argparse
+import importlib.metadata
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import prometheus_client
+
+from benchmarks import fleet
+from py_air_control_exporter import app, metrics, readings_source
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--change-rate", type=float, default=1.0)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="Defaults to standard output.")
+    args = parser.parse_args(argv)
+
+    fleet.register()
+    results = {
+        "python": platform.python_version(),
+        "prometheus_client": importlib.metadata.version("prometheus_client"),
+        "parameters": {
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "failure_rate": args.failure_rate,
+            "change_rate": args.change_rate,
+            "max_concurrency": args.max_concurrency,
+        },
+        "fleets": [
+            bench_fleet(
+                size,
+                repeat=args.repeat,
+                latency=args.latency,
+                failure_rate=args.failure_rate,
+                change_rate=args.change_rate,
+                max_concurrency=args.max_concurrency,
+            )
+            for size in args.sizes
+        ],
+    }
+    output = json.dumps(results, indent=2) + "\n"
+    if args.output is None:
+        sys.stdout.write(output)
+    else:
+        args.output.write_text(output)
+
+
+def bench_fleet(  # noqa: PLR0913
+    size: int,
+    *,
+    repeat: int,
+    latency: float = 0.0,
+    failure_rate: float = 0.0,
+    change_rate: float = 1.0,
+    max_concurrency: int | None = None,
+) -> dict:
+    targets_config = fleet.targets_config(
+        size, latency=latency, failure_rate=failure_rate, change_rate=change_rate
+    )
+    source = readings_source.from_config(
+        targets_config, max_concurrency=max_concurrency
+    )
+    assert source is not None
+
+    readings = source()
+    collector = metrics.PyAirControlCollector(lambda: readings)
+    collected = list(collector.collect())
+    registry = _Collected(collected)
+
+    client = app.create_app(source).test_client()
+    payload = client.get("/metrics").data
+
+    return {
+        "size": size,
+        "fetch_seconds": _measure(source, repeat),
+        "collect_seconds": _measure(lambda: list(collector.collect()), repeat),
+        "render_seconds": _measure(
+            lambda: prometheus_client.generate_latest(registry), repeat
+        ),
+        "scrape_seconds": _measure(lambda: client.get("/metrics"), repeat),
+        "payload_bytes": len(payload),
+        "memory_bytes_per_target": _memory_per_target(source, size),
+    }
+
+
+class _Collected:
+    def __init__(self, collected):
+        self._collected = collected
+
+    def collect(self):
+        return self._collected
+
+
+def _measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "max": max(durations),
+    }
+
+
+def _memory_per_target(source: readings_source.ReadingsSource, size: int) -> float:
+    """Memory held by a snapshot of readings and the collector's samples for it."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        readings = source()
+        collector = metrics.PyAirControlCollector(lambda: readings)
+        collector.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (after - before) / size
+
+
+if __name__ == "__main__":
+    main()
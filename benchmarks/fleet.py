@@ -0,0 +1,88 @@
+import random
+import threading
+import time
+
+from py_air_control_exporter import fetcher_registry, fetchers_api
+
+PROTOCOL = "fake"
+
+
+def targets_config(
+    size: int,
+    *,
+    latency: float = 0.0,
+    failure_rate: float = 0.0,
+    change_rate: float = 1.0,
+) -> dict[str, dict]:
+    """Create the config of a fleet of `size` fake air purifiers.
+
+    Each fetch takes `latency` seconds, fails with probability `failure_rate`, and
+    returns a different reading than the previous fetch with probability
+    `change_rate`.
+    """
+    return {
+        f"purifier-{index}": {
+            "host": f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+            "protocol": PROTOCOL,
+            "latency": latency,
+            "failure_rate": failure_rate,
+            "change_rate": change_rate,
+        }
+        for index in range(size)
+    }
+
+
+def register() -> None:
+    """Make the fake air purifiers available under the `fake` protocol."""
+    fetcher_registry.register_fetcher(PROTOCOL, create_fetcher)
+
+
+def create_fetcher(config: fetchers_api.FetcherCreatorArgs) -> fetchers_api.Fetcher:
+    return _FakeFetcher(
+        config.target_host,
+        latency=config.options.get("latency", 0.0),
+        failure_rate=config.options.get("failure_rate", 0.0),
+        change_rate=config.options.get("change_rate", 1.0),
+        seed=config.target_name,
+    )
+
+
+class _FakeFetcher:
+    def __init__(
+        self,
+        host: str,
+        *,
+        latency: float,
+        failure_rate: float,
+        change_rate: float,
+        seed: str,
+    ):
+        self._host = host
+        self._latency = latency
+        self._failure_rate = failure_rate
+        self._change_rate = change_rate
+        self._random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._pm25 = self._random.uniform(1, 50)
+
+    def __call__(self) -> fetchers_api.TargetReading:
+        if self._latency:
+            time.sleep(self._latency)
+        with self._lock:
+            if self._random.random() < self._failure_rate:
+                return fetchers_api.TargetReading(host=self._host, has_errors=True)
+            if self._random.random() < self._change_rate:
+                self._pm25 = max(0.0, self._pm25 + self._random.uniform(-2, 2))
+            pm25 = self._pm25
+        return fetchers_api.TargetReading(
+            host=self._host,
+            air_quality=fetchers_api.AirQuality(iaql=max(1, pm25 // 5), pm25=pm25),
+            control_info=fetchers_api.ControlInfo(
+                fan_speed=2, is_manual=False, is_on=True
+            ),
+            filters={
+                "0": fetchers_api.Filter(hours=240, filter_type=""),
+                "1": fetchers_api.Filter(hours=2400, filter_type="A3"),
+                "2": fetchers_api.Filter(hours=4800, filter_type="C7"),
+            },
+        )
@@ -0,0 +1,283 @@
+"""Simulate a fleet of Philips air purifiers that speak the encrypted HTTP protocol.
+
+All devices run on one asyncio event loop. Each device listens on its own port, or on
+its own loopback address with `--loopback-addresses`.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+from Cryptodome.Cipher import AES
+from pyairctrl import http_client
+
+_SECURITY_PATH = "/di/v1/products/0/security"
+_STATUS_PATH = "/di/v1/products/1/air"
+_FILTERS_PATH = "/di/v1/products/1/fltsts"
+
+
+@dataclass(frozen=True)
+class Behavior:
+    latency: float = 0.0  # Seconds before each response
+    jitter: float = 0.0  # Maximum seconds added to or removed from the latency
+    drop_rate: float = 0.0  # Probability that a request never gets a response
+    volatility: float = 1.0  # Typical change of PM2.5 per second
+    off_fraction: float = 0.0  # Probability that a device is turned off
+
+
+class SimulatedDevice:
+    def __init__(self, behavior: Behavior, rng: random.Random):
+        self.behavior = behavior
+        self.session_key = os.urandom(16)
+        self.handshakes = 0
+        self.requests = 0
+        self.dropped = 0
+        self.connections = 0
+        self._rng = rng
+        self._is_on = rng.random() >= behavior.off_fraction
+        self._pm25 = rng.uniform(1, 40)
+        self._updated_at = time.monotonic()
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        if self._is_on:
+            step = self.behavior.volatility * math.sqrt(now - self._updated_at)
+            self._pm25 = min(500.0, max(0.0, self._pm25 + self._rng.gauss(0, step)))
+        self._updated_at = now
+        pm25 = round(self._pm25)
+        return {
+            "om": "2" if self._is_on else "s",
+            "pwr": "1" if self._is_on else "0",
+            "mode": "A",
+            "pm25": pm25,
+            "iaql": min(12, 1 + pm25 // 5),
+            "err": 0,
+        }
+
+    def filters(self) -> dict:
+        return {"fltt1": "A3", "fltt2": "C7", "fltsts0": 96, "fltsts1": 2040}
+
+    def exchange_key(self, diffie: str) -> dict:
+        self.handshakes += 1
+        self.session_key = os.urandom(16)
+        secret = self._rng.getrandbits(256)
+        shared_secret = pow(int(diffie, 16), secret, http_client.P)
+        shared_key = shared_secret.to_bytes(128, byteorder="big")[:16]
+        key = AES.new(shared_key, AES.MODE_CBC, bytes(16)).encrypt(self.session_key)
+        return {
+            "key": key.hex(),
+            "hellman": format(pow(http_client.G, secret, http_client.P), "x"),
+        }
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while request := await _read_request(reader):
+                self.requests += 1
+                if self._rng.random() < self.behavior.drop_rate:
+                    # Never answer, like a device that lost the request.
+                    self.dropped += 1
+                    await reader.read()
+                    return
+                await asyncio.sleep(self._delay())
+                writer.write(self._respond(*request))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def disconnect(self) -> None:
+        """Close all open connections and wait for their handlers to finish."""
+        tasks = list(self._connections)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _delay(self) -> float:
+        jitter = self._rng.uniform(-self.behavior.jitter, self.behavior.jitter)
+        return max(0.0, self.behavior.latency + jitter)
+
+    def _respond(self, method: str, path: str, body: bytes) -> bytes:
+        if method == "PUT" and path == _SECURITY_PATH:
+            response = self.exchange_key(json.loads(body)["diffie"])
+            return _response(200, json.dumps(response).encode("ascii"))
+        values = {_STATUS_PATH: self.status, _FILTERS_PATH: self.filters}.get(path)
+        if method != "GET" or values is None:
+            return _response(404, b"")
+        return _response(200, http_client.encrypt(values(), self.session_key))
+
+
+class Simulator:
+    """Runs simulated devices on the current event loop."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        count: int,
+        behavior: Behavior,
+        *,
+        host: str = "127.0.0.1",
+        base_port: int = 0,
+        loopback_addresses: bool = False,
+        seed: int = 0,
+    ):
+        rng = random.Random(seed)  # noqa: S311
+        self.devices = [
+            SimulatedDevice(behavior, random.Random(rng.random()))  # noqa: S311
+            for _ in range(count)
+        ]
+        self.addresses: list[str] = []
+        self._host = host
+        self._base_port = base_port
+        self._loopback_addresses = loopback_addresses
+        self._servers: list[asyncio.Server] = []
+
+    async def start(self) -> None:
+        for index, device in enumerate(self.devices):
+            if self._loopback_addresses:
+                host = f"127.{index >> 16 & 255}.{index >> 8 & 255}.{(index & 255) + 1}"
+                port = self._base_port or 8080
+            else:
+                host = self._host
+                port = self._base_port + index if self._base_port else 0
+            server = await asyncio.start_server(device.handle_connection, host, port)
+            bound_host, bound_port = server.sockets[0].getsockname()[:2]
+            self.addresses.append(f"{bound_host}:{bound_port}")
+            self._servers.append(server)
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+        # Servers do not close the connections that they accepted.
+        await asyncio.gather(*(device.disconnect() for device in self.devices))
+
+    def targets_config(self) -> dict[str, dict]:
+        return {
+            f"simulated-{index}": {"host": address, "protocol": "http"}
+            for index, address in enumerate(self.addresses)
+        }
+
+    def totals(self) -> dict[str, int]:
+        return {
+            counter: sum(getattr(device, counter) for device in self.devices)
+            for counter in ("handshakes", "requests", "dropped", "connections")
+        }
+
+
+class BackgroundSimulator:
+    """Runs a `Simulator` on an event loop in a background thread."""
+
+    def __init__(self, *args, **kwargs):
+        self.simulator = Simulator(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="simulator", daemon=True
+        )
+
+    def __enter__(self) -> Simulator:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.simulator.start(), self._loop).result()
+        return self.simulator
+
+    def __exit__(self, *args):
+        asyncio.run_coroutine_threadsafe(self.simulator.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, str, bytes] | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    content_length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+    return method, path, await reader.readexactly(content_length)
+
+
+def _response(status: int, body: bytes) -> bytes:
+    reason = "OK" if status == 200 else "Not Found"
+    head = f"HTTP/1.1 {status} {reason}\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode("ascii") + body
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--base-port",
+        type=int,
+        default=0,
+        help="Devices listen on consecutive ports from this one. Defaults to random "
+        "ports.",
+    )
+    parser.add_argument("--loopback-addresses", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--volatility", type=float, default=1.0)
+    parser.add_argument("--off-fraction", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--config-out",
+        type=Path,
+        help="Write an exporter config with all simulated devices to this file.",
+    )
+    args = parser.parse_args(argv)
+
+    behavior = Behavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        volatility=args.volatility,
+        off_fraction=args.off_fraction,
+    )
+    simulator = Simulator(
+        args.count,
+        behavior,
+        host=args.host,
+        base_port=args.base_port,
+        loopback_addresses=args.loopback_addresses,
+        seed=args.seed,
+    )
+    asyncio.run(_serve(simulator, args.config_out))
+
+
+async def _serve(simulator: Simulator, config_out: Path | None) -> None:
+    await simulator.start()
+    _write_config(simulator, config_out)
+    await asyncio.Event().wait()
+
+
+def _write_config(simulator: Simulator, config_out: Path | None) -> None:
+    config = yaml.safe_dump({"targets": simulator.targets_config()})
+    if config_out is None:
+        sys.stdout.write(config)
+        sys.stdout.flush()
+    else:
+        config_out.write_text(config)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,54 @@ import prometheus_client
 from flask import Flask
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
-from py_air_control_exporter import metrics, readings_source
+from py_air_control_exporter import (
+    deadline,
+    exposition_cache,
+    instrumentation,
+    metrics,
+    readings_source,
+)
 
 
-def create_app(readings_source: readings_source.ReadingsSource):
+def create_app(
+    readings_source: readings_source.ReadingsSource,
+    *,
+    cache_exposition: bool = False,
+    scrape_timeout_margin: float = deadline.DEFAULT_SAFETY_MARGIN,
+):
     app = Flask(__name__)
-    metrics_collector_registry = prometheus_client.CollectorRegistry(auto_describe=True)
-    metrics_collector_registry.register(metrics.PyAirControlCollector(readings_source))
     app.wsgi_app = DispatcherMiddleware(
         app.wsgi_app,
-        {"/metrics": prometheus_client.make_wsgi_app(metrics_collector_registry)},
+        {
+            "/metrics": create_metrics_app(
+                readings_source,
+                cache_exposition=cache_exposition,
+                scrape_timeout_margin=scrape_timeout_margin,
+            )
+        },
     )
     return app
+
+
+def create_metrics_app(
+    readings_source: readings_source.ReadingsSource,
+    *,
+    cache_exposition: bool = False,
+    scrape_timeout_margin: float = deadline.DEFAULT_SAFETY_MARGIN,
+):
+    """Create a WSGI app that serves metrics without Flask.
+
+    With `cache_exposition`, metrics are rendered only when the readings source
+    returns a new snapshot of readings. Scrapes that send the Prometheus scrape
+    timeout get readings that were fetched until `scrape_timeout_margin` seconds
+    before that timeout.
+    """
+    if cache_exposition:
+        metrics_app = exposition_cache.CachedMetricsApp(readings_source)
+    else:
+        metrics_app = prometheus_client.make_wsgi_app(
+            metrics.create_registry(readings_source)
+        )
+    return instrumentation.instrument_scrapes(
+        deadline.honor_scrape_timeout(metrics_app, scrape_timeout_margin)
+    )
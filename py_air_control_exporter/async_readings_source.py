@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from py_air_control_exporter import deadline, fetchers_api
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AsyncTarget:
+    host: str
+    fetcher: fetchers_api.AsyncFetcher
+    timeout: float  # Seconds after which the target's reading is an error
+
+
+class AsyncReadingsSource:
+    """A readings source that fetches all targets concurrently on one event loop.
+
+    The event loop runs in a background thread. Synchronous fetchers adapted to
+    asyncio run in a thread pool with at most `max_concurrency` threads.
+
+    Targets that have not returned a reading by the deadline of the current scrape
+    are reported with their last good reading, or as errors.
+    """
+
+    def __init__(
+        self,
+        targets: dict[str, AsyncTarget],
+        *,
+        max_concurrency: int | None = None,
+    ):
+        self._targets = targets
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="async-readings-source"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._executor)
+        self._semaphore = asyncio.Semaphore(max_concurrency or len(targets))
+        self._last_good = deadline.LastGoodReadings()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="async-readings-source", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self) -> dict[str, fetchers_api.TargetReading]:
+        # The deadline is read here, because the event loop runs in another context.
+        remaining = deadline.remaining()
+        deadline_at = None if remaining is None else time.monotonic() + remaining
+        return asyncio.run_coroutine_threadsafe(
+            self._fetch_all(deadline_at), self._loop
+        ).result()
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=True)
+
+    async def _fetch_all(
+        self, deadline_at: float | None
+    ) -> dict[str, fetchers_api.TargetReading]:
+        readings = await asyncio.gather(
+            *(
+                self._fetch(name, target, deadline_at)
+                for name, target in self._targets.items()
+            )
+        )
+        return dict(zip(self._targets, readings, strict=True))
+
+    async def _fetch(
+        self, name: str, target: AsyncTarget, deadline_at: float | None
+    ) -> fetchers_api.TargetReading:
+        async with self._semaphore:
+            timeout = target.timeout
+            if deadline_at is not None:
+                timeout = min(timeout, max(0.0, deadline_at - time.monotonic()))
+            try:
+                reading = await asyncio.wait_for(target.fetcher(), timeout)
+            except TimeoutError:
+                if timeout < target.timeout:
+                    return self._last_good.late(name, target.host)
+                LOG.error(
+                    "Fetching a reading for target '%s' timed out after %s seconds.",
+                    name,
+                    target.timeout,
+                )
+                return fetchers_api.TargetReading(host=target.host, has_errors=True)
+            self._last_good.record(name, reading)
+            return reading
@@ -0,0 +1,148 @@
+import enum
+import logging
+import random
+import threading
+import time
+
+from py_air_control_exporter import fetchers_api, instrumentation
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BACKOFF = 15.0
+DEFAULT_MAX_BACKOFF = 600.0
+
+
+class State(enum.IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """Decides whether a target is worth fetching from.
+
+    After `failure_threshold` consecutive failed readings the breaker opens and the
+    target is skipped. After a backoff, a single reading is attempted: if it succeeds
+    the breaker closes again, and if it fails the breaker opens with twice the backoff,
+    up to `max_backoff` seconds. Backoffs are randomized between half and all of their
+    length, so that targets that failed together are not retried together.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+    ):
+        self._failure_threshold = failure_threshold
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._state = State.CLOSED
+        self._failures = 0
+        self._opened = 0
+        self._retry_at = 0.0
+
+    @property
+    def state(self) -> State:
+        return self._state
+
+    def allow(self) -> bool:
+        """Return whether the target should be fetched from now."""
+        with self._lock:
+            if self._state == State.CLOSED:
+                return True
+            if self._state == State.OPEN and time.monotonic() >= self._retry_at:
+                self._state = State.HALF_OPEN
+                return True
+            return False
+
+    def record(self, reading: fetchers_api.TargetReading) -> float | None:
+        """Record the result of a fetch.
+
+        Return the number of seconds the target will be skipped for, if the breaker
+        opened.
+        """
+        with self._lock:
+            if not reading.has_errors:
+                self._state = State.CLOSED
+                self._failures = 0
+                self._opened = 0
+                return None
+            self._failures += 1
+            if self._state == State.CLOSED and self._failures < self._failure_threshold:
+                return None
+            delay = min(self._max_backoff, self._backoff * 2**self._opened)
+            delay *= random.uniform(0.5, 1.0)  # noqa: S311
+            self._state = State.OPEN
+            self._opened += 1
+            self._retry_at = time.monotonic() + delay
+            return delay
+
+
+def protect_fetcher(
+    name: str,
+    host: str,
+    fetcher: fetchers_api.Fetcher,
+    breaker: CircuitBreaker,
+) -> fetchers_api.Fetcher:
+    def _protected_fetcher() -> fetchers_api.TargetReading:
+        if not _allow(name, host, breaker):
+            return _failed(host)
+        try:
+            reading = fetcher()
+        except BaseException:
+            _record(name, host, breaker, _failed(host))
+            raise
+        _record(name, host, breaker, reading)
+        return reading
+
+    return _protected_fetcher
+
+
+def protect_async_fetcher(
+    name: str,
+    host: str,
+    fetcher: fetchers_api.AsyncFetcher,
+    breaker: CircuitBreaker,
+) -> fetchers_api.AsyncFetcher:
+    async def _protected_fetcher() -> fetchers_api.TargetReading:
+        if not _allow(name, host, breaker):
+            return _failed(host)
+        try:
+            reading = await fetcher()
+        except BaseException:
+            # Also when the fetch is cancelled, for example after a timeout
+            _record(name, host, breaker, _failed(host))
+            raise
+        _record(name, host, breaker, reading)
+        return reading
+
+    return _protected_fetcher
+
+
+def _failed(host: str) -> fetchers_api.TargetReading:
+    return fetchers_api.TargetReading(host=host, has_errors=True)
+
+
+def _allow(name: str, host: str, breaker: CircuitBreaker) -> bool:
+    is_allowed = breaker.allow()
+    instrumentation.CIRCUIT_BREAKER_STATE.labels(host, name).set(breaker.state)
+    return is_allowed
+
+
+def _record(
+    name: str,
+    host: str,
+    breaker: CircuitBreaker,
+    reading: fetchers_api.TargetReading,
+) -> None:
+    delay = breaker.record(reading)
+    instrumentation.CIRCUIT_BREAKER_STATE.labels(host, name).set(breaker.state)
+    if delay is not None:
+        LOG.warning(
+            "Skipping target '%s' for %.1f seconds after it failed to return a "
+            "reading.",
+            name,
+            delay,
+        )
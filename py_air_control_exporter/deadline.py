@@ -0,0 +1,99 @@
+import contextlib
+import contextvars
+import dataclasses
+import logging
+import threading
+import time
+from collections.abc import Iterator
+
+from py_air_control_exporter import fetchers_api
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_SAFETY_MARGIN = 0.5
+
+_SCRAPE_TIMEOUT_HEADER = "HTTP_X_PROMETHEUS_SCRAPE_TIMEOUT_SECONDS"
+
+# Monotonic time by which the current scrape has to be answered
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+def remaining() -> float | None:
+    """Return the seconds left until the current deadline, or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+@contextlib.contextmanager
+def deadline_after(seconds: float | None) -> Iterator[None]:
+    """Set a deadline `seconds` from now for the code in this context."""
+    if seconds is None:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def honor_scrape_timeout(app, safety_margin: float = DEFAULT_SAFETY_MARGIN):
+    """Wrap a WSGI app so that scrapes have a deadline.
+
+    The deadline is derived from the scrape timeout that Prometheus sends with each
+    scrape, minus `safety_margin` seconds to render and send the response.
+    """
+
+    def _app_with_deadline(environ, start_response):
+        timeout = _parse_timeout(environ.get(_SCRAPE_TIMEOUT_HEADER))
+        if timeout is not None:
+            timeout = max(0.0, timeout - safety_margin)
+        with deadline_after(timeout):
+            return app(environ, start_response)
+
+    return _app_with_deadline
+
+
+class LastGoodReadings:
+    """Remembers the last reading without errors of each target.
+
+    Used to report targets that miss a deadline.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._readings: dict[str, tuple[fetchers_api.TargetReading, float]] = {}
+
+    def record(self, name: str, reading: fetchers_api.TargetReading) -> None:
+        if not reading.has_errors:
+            with self._lock:
+                self._readings[name] = (reading, time.time())
+
+    def late(self, name: str, host: str) -> fetchers_api.TargetReading:
+        """Return the reading to report for a target that missed the deadline.
+
+        This is the last good reading with the time it was fetched, or an errored
+        reading if there is none.
+        """
+        LOG.warning("Target '%s' did not return a reading before the deadline.", name)
+        with self._lock:
+            last_good = self._readings.get(name)
+        if last_good is None:
+            return fetchers_api.TargetReading(host=host, has_errors=True)
+        reading, fetched_at = last_good
+        return dataclasses.replace(reading, fetched_at=reading.fetched_at or fetched_at)
+
+
+def _parse_timeout(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        LOG.warning("Ignoring invalid scrape timeout %r.", value)
+        return None
+    return timeout if timeout > 0 else None
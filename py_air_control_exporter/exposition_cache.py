@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+
+from prometheus_client import Metric, exposition
+
+from py_air_control_exporter import fetchers_api, metrics, readings_source
+
+
+@dataclass(frozen=True)
+class _Rendered:
+    content_type: str
+    body: bytes
+    gzipped_body: bytes
+    etag: str
+
+    @staticmethod
+    def create(content_type: str, body: bytes) -> "_Rendered":
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return _Rendered(
+            content_type=content_type,
+            body=body,
+            gzipped_body=gzip.compress(body, mtime=0),
+            etag=f'"{digest}"',
+        )
+
+
+class CachedMetricsApp:
+    """A WSGI app that renders metrics once per snapshot of readings.
+
+    Readings sources that poll or cache readings return the same snapshot object until
+    they have new readings. Until then, this app serves the bytes it rendered for that
+    snapshot, gzipped if the client accepts it. Clients that send the ETag of the
+    current rendering in `If-None-Match` get an empty `304 Not Modified` response.
+    """
+
+    def __init__(self, readings_source: readings_source.ReadingsSource):
+        self._readings_source = readings_source
+        self._lock = threading.Lock()
+        self._snapshot: dict[str, fetchers_api.TargetReading] = {}
+        self._rendered_snapshot: dict[str, fetchers_api.TargetReading] | None = None
+        self._collected: list[Metric] = []
+        self._rendered: dict[str, _Rendered] = {}
+        self._registry = metrics.create_registry(lambda: self._snapshot)
+        if hasattr(readings_source, "collect"):
+            self._registry.register(readings_source)
+
+    def __call__(self, environ, start_response):
+        rendered = self._render(environ.get("HTTP_ACCEPT", ""))
+        headers = [
+            ("Content-Type", rendered.content_type),
+            ("ETag", rendered.etag),
+            ("Vary", "Accept, Accept-Encoding"),
+        ]
+        if _etag_matches(rendered.etag, environ.get("HTTP_IF_NONE_MATCH", "")):
+            start_response("304 Not Modified", headers)
+            return [b""]
+
+        body = rendered.body
+        if _accepts_gzip(environ.get("HTTP_ACCEPT_ENCODING", "")):
+            body = rendered.gzipped_body
+            headers.append(("Content-Encoding", "gzip"))
+        headers.append(("Content-Length", str(len(body))))
+        start_response("200 OK", headers)
+        return [body]
+
+    def _render(self, accept_header: str) -> _Rendered:
+        readings = self._readings_source()
+        encoder, content_type = exposition.choose_encoder(accept_header)
+        with self._lock:
+            if readings is not self._rendered_snapshot:
+                self._snapshot = readings
+                self._collected = list(self._registry.collect())
+                self._rendered = {}
+                self._rendered_snapshot = readings
+            rendered = self._rendered.get(content_type)
+            if rendered is None:
+                body = encoder(_Collected(self._collected))
+                rendered = self._rendered[content_type] = _Rendered.create(
+                    content_type, body
+                )
+            return rendered
+
+
+class _Collected:
+    """Metrics that were already collected, presented as a collector."""
+
+    def __init__(self, collected: list[Metric]):
+        self._collected = collected
+
+    def collect(self):
+        return self._collected
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    return any(
+        candidate.strip() in (etag, "*") for candidate in if_none_match.split(",")
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    return any(
+        encoding.split(";")[0].strip() == "gzip"
+        for encoding in accept_encoding.split(",")
+    )
@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Iterable
 
 from py_air_control_exporter import fetchers_api
@@ -7,19 +8,60 @@ _KNOWN_FETCHERS: dict[str, fetchers_api.FetcherCreator] = {
     "http": http_philips.create_fetcher,
 }
 
+_KNOWN_ASYNC_FETCHERS: dict[str, fetchers_api.AsyncFetcherCreator] = {
+    "http": http_philips.create_async_fetcher,
+}
+
 
 class UnknownProtocolError(Exception):
     pass
 
 
+def register_fetcher(protocol: str, fetcher_creator: fetchers_api.FetcherCreator):
+    """Make fetchers created by `fetcher_creator` available under `protocol`."""
+    _KNOWN_FETCHERS[protocol] = fetcher_creator
+
+
+def register_async_fetcher(
+    protocol: str, fetcher_creator: fetchers_api.AsyncFetcherCreator
+):
+    """Make asyncio fetchers created by `fetcher_creator` available under `protocol`."""
+    _KNOWN_ASYNC_FETCHERS[protocol] = fetcher_creator
+
+
 def get_known_protocols() -> Iterable[str]:
-    return _KNOWN_FETCHERS.keys()
+    return sorted(_KNOWN_FETCHERS.keys() | _KNOWN_ASYNC_FETCHERS.keys())
 
 
 def create_fetcher(
     protocol: str, fetcher_config: fetchers_api.FetcherCreatorArgs
 ) -> fetchers_api.Fetcher:
     fetcher_creator = _KNOWN_FETCHERS.get(protocol)
-    if fetcher_creator is None:
+    if fetcher_creator is not None:
+        return fetcher_creator(fetcher_config)
+    async_fetcher_creator = _KNOWN_ASYNC_FETCHERS.get(protocol)
+    if async_fetcher_creator is None:
         raise UnknownProtocolError
-    return fetcher_creator(fetcher_config)
+    async_fetcher = async_fetcher_creator(fetcher_config)
+    return lambda: asyncio.run(_await(async_fetcher))
+
+
+def create_async_fetcher(
+    protocol: str, fetcher_config: fetchers_api.FetcherCreatorArgs
+) -> fetchers_api.AsyncFetcher:
+    """Create an asyncio fetcher for the given protocol.
+
+    Protocols without an asyncio fetcher get their synchronous fetcher run in the
+    event loop's default executor.
+    """
+    async_fetcher_creator = _KNOWN_ASYNC_FETCHERS.get(protocol)
+    if async_fetcher_creator is not None:
+        return async_fetcher_creator(fetcher_config)
+    fetcher = create_fetcher(protocol, fetcher_config)
+    return lambda: asyncio.get_running_loop().run_in_executor(None, fetcher)
+
+
+async def _await(
+    async_fetcher: fetchers_api.AsyncFetcher,
+) -> fetchers_api.TargetReading:
+    return await async_fetcher()
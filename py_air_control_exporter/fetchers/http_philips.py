@@ -1,4 +1,14 @@
+import asyncio
+import http.client
+import json
 import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 from pyairctrl import http_client
 
@@ -6,34 +16,92 @@ from py_air_control_exporter import fetchers_api
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT = 10.0
+
 _FAN_SPEED_TO_INT = {"s": 0, "1": 1, "2": 2, "3": 3, "t": 4}
 
+_SECURITY_PATH = "/di/v1/products/0/security"
+_STATUS_PATH = "/di/v1/products/1/air"
+_FILTERS_PATH = "/di/v1/products/1/fltsts"
+
+
+class FiltersCache:
+    """Keeps the filters data of a device for `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._filters_data: dict | None = None
+        self._expires_at = 0.0
+
+    def get(self) -> dict | None:
+        if time.monotonic() < self._expires_at:
+            return self._filters_data
+        return None
+
+    def put(self, filters_data: dict) -> None:
+        self._filters_data = filters_data
+        self._expires_at = time.monotonic() + self._interval
+
 
 def create_fetcher(config: fetchers_api.FetcherCreatorArgs) -> fetchers_api.Fetcher:
-    return lambda target_host=config.target_host: get_reading(target_host)
+    session = Session(
+        config.target_host,
+        key_lifetime=config.options.get("key_lifetime"),
+        timeout=config.options.get("timeout", DEFAULT_TIMEOUT),
+    )
+    filters_cache = FiltersCache(config.options.get("filters_interval", 0))
+    return lambda target_host=config.target_host: get_reading(
+        target_host, session, filters_cache
+    )
 
 
-def get_reading(host: str) -> fetchers_api.TargetReading:
-    client = http_client.HTTPAirClient(host)
+def get_reading(
+    host: str,
+    client: http_client.HTTPAirClient | None = None,
+    filters_cache: FiltersCache | None = None,
+) -> fetchers_api.TargetReading:
+    if client is None:
+        client = http_client.HTTPAirClient(host)
 
     try:
-        status_data = client.get_status() or {}
-        filters_data = client.get_filters() or {}
-
-        return fetchers_api.TargetReading(
-            host=host,
-            has_errors=False,
-            air_quality=create_air_quality(status_data),
-            control_info=create_control_info(status_data),
-            filters=create_filter_info(filters_data),
+        filters_data = filters_cache.get() if filters_cache is not None else None
+        # Sessions request the filters while waiting for the status.
+        filters_future = (
+            client.request_filters()
+            if filters_data is None and isinstance(client, Session)
+            else None
         )
+        status_data = client.get_status()
+        if filters_data is None:
+            filters_data = (
+                filters_future.result() if filters_future else client.get_filters()
+            ) or {}
+            if filters_cache is not None:
+                filters_cache.put(filters_data)
+
+        return _create_reading(host, status_data, filters_data)
 
     except Exception as ex:
-        LOG.error(
-            "Could not read values from air control device %s. Error: %s", host, ex
-        )
-        LOG.debug("Exception stack trace:", exc_info=True)
-        return fetchers_api.TargetReading(host=host, has_errors=True)
+        return _error_reading(host, ex)
+
+
+def _create_reading(
+    host: str, status_data: dict | None, filters_data: dict | None
+) -> fetchers_api.TargetReading:
+    status_data = status_data or {}
+    return fetchers_api.TargetReading(
+        host=host,
+        has_errors=False,
+        air_quality=create_air_quality(status_data),
+        control_info=create_control_info(status_data),
+        filters=create_filter_info(filters_data or {}),
+    )
+
+
+def _error_reading(host: str, ex: Exception) -> fetchers_api.TargetReading:
+    LOG.error("Could not read values from air control device %s. Error: %s", host, ex)
+    LOG.debug("Exception stack trace:", exc_info=ex)
+    return fetchers_api.TargetReading(host=host, has_errors=True)
 
 
 def create_air_quality(status_data: dict) -> fetchers_api.AirQuality:
@@ -59,3 +127,286 @@ def create_filter_info(filters_data: dict) -> dict[str, fetchers_api.Filter]:
             )
 
     return filters
+
+
+class Session(http_client.HTTPAirClient):
+    """A long-lived client for a single air purifier.
+
+    Unlike `HTTPAirClient`, this client keeps its HTTP connections open between
+    requests and keeps the session key in memory. A new key is exchanged only when a
+    response cannot be decrypted or when the key is older than `key_lifetime` seconds.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        key_lifetime: float | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        # The base constructor exchanges a key right away, so it is not called here.
+        self._host = host
+        self._debug = False
+        self._session_key = None
+        self._key_lifetime = key_lifetime
+        self._key_expires_at = math.inf
+        self._timeout = timeout
+        self._key_lock = threading.Lock()
+        self._connections_lock = threading.Lock()
+        self._idle_connections: list[http.client.HTTPConnection] = []
+        # Each session has its own thread for filters requests, so that the requests
+        # of one device never wait for those of other devices.
+        self._helper = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"http-philips-{host}"
+        )
+        self.handshakes = 0
+
+    def request_filters(self) -> "Future[dict]":
+        """Request the filters on this session's helper thread."""
+        return self._helper.submit(self.get_filters)
+
+    def _get_key(self):
+        secret, request = _key_exchange_request()
+        response = self._request("PUT", _SECURITY_PATH, request)
+        self._session_key = _key_exchange_result(secret, response)
+        self.handshakes += 1
+        if self._key_lifetime is not None:
+            self._key_expires_at = time.monotonic() + self._key_lifetime
+
+    def _get(self, url):
+        session_key = self._valid_session_key()
+        try:
+            return self._get_once(url, session_key)
+        except ValueError:
+            LOG.debug("Could not decrypt response from %s. Exchanging a new key.", url)
+            return self._get_once(url, self._valid_session_key(expired=session_key))
+
+    def _get_once(self, url, session_key=None):
+        response = self._request("GET", urlsplit(url).path)
+        return _decrypt_json(response, session_key or self._session_key)
+
+    def _valid_session_key(self, expired: bytes | None = None) -> bytes:
+        with self._key_lock:
+            if (
+                self._session_key is None
+                or self._session_key == expired
+                or time.monotonic() >= self._key_expires_at
+            ):
+                self._get_key()
+            assert self._session_key is not None
+            return self._session_key
+
+    def _request(self, method: str, path: str, body: bytes | None = None) -> str:
+        with self._connections_lock:
+            connection = (
+                self._idle_connections.pop() if self._idle_connections else None
+            )
+        try:
+            response = self._request_once(connection, method, path, body)
+        except ConnectionError:
+            if connection is None:
+                raise
+            # The device might have closed the idle connection, so retry on a new one.
+            connection = None
+            response = self._request_once(connection, method, path, body)
+        return response
+
+    def _request_once(
+        self,
+        connection: http.client.HTTPConnection | None,
+        method: str,
+        path: str,
+        body: bytes | None,
+    ) -> str:
+        if connection is None:
+            connection = http.client.HTTPConnection(self._host, timeout=self._timeout)
+        try:
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        if response.status != http.client.OK:
+            connection.close()
+            msg = f"{method} {path} failed with HTTP status {response.status}"
+            raise http.client.HTTPException(msg)
+        if response.will_close:
+            connection.close()
+        else:
+            with self._connections_lock:
+                self._idle_connections.append(connection)
+        return data.decode("ascii")
+
+
+class AsyncSession:
+    """A long-lived asyncio client for a single air purifier.
+
+    This is the asyncio counterpart of `Session`.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        key_lifetime: float | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        address = urlsplit(f"//{host}")
+        self._hostname = address.hostname
+        self._port = address.port or http.client.HTTP_PORT
+        self._host = host
+        self._session_key: bytes | None = None
+        self._key_lifetime = key_lifetime
+        self._key_expires_at = math.inf
+        self._timeout = timeout
+        self._key_lock = asyncio.Lock()
+        self._idle_connections: list[
+            tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        ] = []
+        self.handshakes = 0
+
+    async def get_status(self) -> dict:
+        return await self._get(_STATUS_PATH)
+
+    async def get_filters(self) -> dict:
+        return await self._get(_FILTERS_PATH)
+
+    async def _get(self, path: str) -> dict:
+        session_key = await self._valid_session_key()
+        try:
+            return _decrypt_json(await self._request("GET", path), session_key)
+        except ValueError:
+            LOG.debug("Could not decrypt response from %s. Exchanging a new key.", path)
+            session_key = await self._valid_session_key(expired=session_key)
+            return _decrypt_json(await self._request("GET", path), session_key)
+
+    async def _valid_session_key(self, expired: bytes | None = None) -> bytes:
+        async with self._key_lock:
+            if (
+                self._session_key is None
+                or self._session_key == expired
+                or time.monotonic() >= self._key_expires_at
+            ):
+                secret, request = _key_exchange_request()
+                response = await self._request("PUT", _SECURITY_PATH, request)
+                self._session_key = _key_exchange_result(secret, response)
+                self.handshakes += 1
+                if self._key_lifetime is not None:
+                    self._key_expires_at = time.monotonic() + self._key_lifetime
+            return self._session_key
+
+    async def _request(self, method: str, path: str, body: bytes | None = None) -> str:
+        async with asyncio.timeout(self._timeout):
+            connection = (
+                self._idle_connections.pop() if self._idle_connections else None
+            )
+            try:
+                return await self._request_once(connection, method, path, body)
+            except ConnectionError:
+                if connection is None:
+                    raise
+                # The device might have closed the idle connection, so retry on a
+                # new one.
+                return await self._request_once(None, method, path, body)
+
+    async def _request_once(
+        self,
+        connection: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None,
+        method: str,
+        path: str,
+        body: bytes | None,
+    ) -> str:
+        if connection is None:
+            connection = await asyncio.open_connection(self._hostname, self._port)
+        reader, writer = connection
+        try:
+            body = body or b""
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self._host}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                + body
+            )
+            await writer.drain()
+            status, headers = await _read_response_head(reader)
+            data = await reader.readexactly(int(headers.get("content-length", 0)))
+        except BaseException:
+            writer.close()
+            raise
+        if status != http.client.OK:
+            writer.close()
+            msg = f"{method} {path} failed with HTTP status {status}"
+            raise http.client.HTTPException(msg)
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle_connections.append(connection)
+        return data.decode("ascii")
+
+
+def create_async_fetcher(
+    config: fetchers_api.FetcherCreatorArgs,
+) -> fetchers_api.AsyncFetcher:
+    session = AsyncSession(
+        config.target_host,
+        key_lifetime=config.options.get("key_lifetime"),
+        timeout=config.options.get("timeout", DEFAULT_TIMEOUT),
+    )
+    filters_cache = FiltersCache(config.options.get("filters_interval", 0))
+    return lambda target_host=config.target_host: get_reading_async(
+        target_host, session, filters_cache
+    )
+
+
+async def get_reading_async(
+    host: str,
+    session: AsyncSession,
+    filters_cache: FiltersCache | None = None,
+) -> fetchers_api.TargetReading:
+    try:
+        filters_data = filters_cache.get() if filters_cache is not None else None
+        if filters_data is None:
+            status_data, filters_data = await asyncio.gather(
+                session.get_status(), session.get_filters()
+            )
+            if filters_cache is not None:
+                filters_cache.put(filters_data)
+        else:
+            status_data = await session.get_status()
+
+        return _create_reading(host, status_data, filters_data)
+
+    except Exception as ex:
+        return _error_reading(host, ex)
+
+
+async def _read_response_head(
+    reader: asyncio.StreamReader,
+) -> tuple[int, dict[str, str]]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise http.client.RemoteDisconnected
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers
+
+
+def _key_exchange_request() -> tuple[int, bytes]:
+    secret = random.getrandbits(256)
+    request = {"diffie": format(pow(http_client.G, secret, http_client.P), "x")}
+    return secret, json.dumps(request).encode("ascii")
+
+
+def _key_exchange_result(secret: int, response: str) -> bytes:
+    dh = json.loads(response)
+    shared_secret = pow(int(dh["hellman"], 16), secret, http_client.P)
+    shared_key = shared_secret.to_bytes(128, byteorder="big")[:16]
+    return http_client.aes_decrypt(bytes.fromhex(dh["key"]), shared_key)[:16]
+
+
+def _decrypt_json(response: str, session_key: bytes) -> dict:
+    return json.loads(
+        http_client.decrypt(response, session_key), object_pairs_hook=OrderedDict
+    )
@@ -1,5 +1,6 @@
-from collections.abc import Callable
-from dataclasses import dataclass
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
 
 
 @dataclass(frozen=True)
@@ -28,15 +29,22 @@ class TargetReading:
     air_quality: AirQuality | None = None
     control_info: ControlInfo | None = None
     filters: dict[str, Filter] | None = None
+    fetched_at: float | None = None  # Unix time of the fetch, if known
 
 
 Fetcher = Callable[[], TargetReading]
 
+AsyncFetcher = Callable[[], Awaitable[TargetReading]]
+
 
 @dataclass(frozen=True)
 class FetcherCreatorArgs:
     target_host: str
     target_name: str
+    # Protocol-specific options from the target's config
+    options: Mapping[str, Any] = field(default_factory=dict)
 
 
 FetcherCreator = Callable[[FetcherCreatorArgs], Fetcher]
+
+AsyncFetcherCreator = Callable[[FetcherCreatorArgs], AsyncFetcher]
@@ -0,0 +1,109 @@
+import time
+from collections.abc import Iterable
+
+import prometheus_client
+from prometheus_client import Metric, registry
+
+from py_air_control_exporter import fetchers_api
+
+# Metrics about the exporter itself. They are shared by all readings sources and apps
+# in the process, so they are not registered with any registry by default.
+FETCH_DURATION = prometheus_client.Histogram(
+    "py_air_control_exporter_fetch_duration_seconds",
+    "Seconds spent fetching a reading from the air purifier.",
+    labelnames=["host", "name"],
+    registry=None,
+    # Fewer buckets than the default, because this histogram exists for every target.
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LAST_FETCH_ATTEMPT = prometheus_client.Gauge(
+    "py_air_control_exporter_last_fetch_attempt_timestamp_seconds",
+    "Unix time when fetching a reading from the air purifier last started.",
+    labelnames=["host", "name"],
+    registry=None,
+)
+LAST_FETCH_SUCCESS = prometheus_client.Gauge(
+    "py_air_control_exporter_last_fetch_success_timestamp_seconds",
+    "Unix time when a reading was last fetched from the air purifier without errors.",
+    labelnames=["host", "name"],
+    registry=None,
+)
+FETCHES_IN_FLIGHT = prometheus_client.Gauge(
+    "py_air_control_exporter_fetches_in_flight",
+    "The number of readings that are currently being fetched.",
+    registry=None,
+)
+SCRAPE_DURATION = prometheus_client.Histogram(
+    "py_air_control_exporter_scrape_duration_seconds",
+    "Seconds spent collecting and rendering metrics for a scrape.",
+    registry=None,
+)
+CIRCUIT_BREAKER_STATE = prometheus_client.Gauge(
+    "py_air_control_exporter_circuit_breaker_state",
+    "State of the target's circuit breaker: 0 if closed, 1 if half-open, 2 if open "
+    "and the target is skipped.",
+    labelnames=["host", "name"],
+    registry=None,
+)
+
+_METRICS = (
+    FETCH_DURATION,
+    LAST_FETCH_ATTEMPT,
+    LAST_FETCH_SUCCESS,
+    FETCHES_IN_FLIGHT,
+    SCRAPE_DURATION,
+    CIRCUIT_BREAKER_STATE,
+)
+
+
+class SelfMetricsCollector(registry.Collector):
+    def collect(self) -> Iterable[Metric]:
+        for metric in _METRICS:
+            yield from metric.collect()
+
+
+def instrument_fetcher(
+    name: str, host: str, fetcher: fetchers_api.Fetcher
+) -> fetchers_api.Fetcher:
+    def _instrumented_fetcher() -> fetchers_api.TargetReading:
+        LAST_FETCH_ATTEMPT.labels(host, name).set(time.time())
+        with (
+            FETCHES_IN_FLIGHT.track_inprogress(),
+            FETCH_DURATION.labels(host, name).time(),
+        ):
+            reading = fetcher()
+        _record_reading(name, host, reading)
+        return reading
+
+    return _instrumented_fetcher
+
+
+def instrument_async_fetcher(
+    name: str, host: str, fetcher: fetchers_api.AsyncFetcher
+) -> fetchers_api.AsyncFetcher:
+    async def _instrumented_fetcher() -> fetchers_api.TargetReading:
+        LAST_FETCH_ATTEMPT.labels(host, name).set(time.time())
+        with (
+            FETCHES_IN_FLIGHT.track_inprogress(),
+            FETCH_DURATION.labels(host, name).time(),
+        ):
+            reading = await fetcher()
+        _record_reading(name, host, reading)
+        return reading
+
+    return _instrumented_fetcher
+
+
+def instrument_scrapes(app):
+    """Wrap a WSGI app so that the time it spends on each request is measured."""
+
+    def _instrumented_app(environ, start_response):
+        with SCRAPE_DURATION.time():
+            return app(environ, start_response)
+
+    return _instrumented_app
+
+
+def _record_reading(name: str, host: str, reading: fetchers_api.TargetReading) -> None:
+    if not reading.has_errors:
+        LAST_FETCH_SUCCESS.labels(host, name).set(time.time())
@@ -6,7 +6,15 @@ from typing import Any
 import click
 import yaml
 
-from py_air_control_exporter import app, fetcher_registry, readings_source
+from py_air_control_exporter import (
+    app,
+    circuit_breaker,
+    deadline,
+    fetcher_registry,
+    readings_cache,
+    readings_source,
+    server,
+)
 
 LOG = logging.getLogger(__name__)
 
@@ -56,11 +64,63 @@ LOG = logging.getLogger(__name__)
     type=click.Path(exists=True, dir_okay=False, path_type=Path),
     help="Path to configuration file.",
 )
-def main(host, name, protocol, listen_address, listen_port, config, verbose, quiet):  # noqa: PLR0913
+@click.option(
+    "--server",
+    "server_name",
+    default="flask",
+    type=click.Choice(server.SERVERS, case_sensitive=False),
+    show_default=True,
+    help="The HTTP server to use. `flask` is Flask's development server. `threaded` "
+    "serves the same app with a pool of threads. `prometheus` serves only the metrics "
+    "with a pool of threads and without Flask.",
+)
+@click.option(
+    "--threads",
+    default=8,
+    show_default=True,
+    help="The number of threads serving HTTP requests (not used by `--server=flask`).",
+)
+@click.option(
+    "--backlog",
+    default=64,
+    show_default=True,
+    help="The number of HTTP connections that can wait for a free thread (not used "
+    "by `--server=flask`).",
+)
+@click.option(
+    "--shard-count",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Split the targets into this many shards, one per exporter.",
+)
+@click.option(
+    "--shard-index",
+    default=0,
+    type=click.IntRange(min=0),
+    show_default=True,
+    help="The shard of targets that this exporter fetches, from 0 to "
+    "`--shard-count` - 1.",
+)
+def main(  # noqa: PLR0913
+    host,
+    name,
+    protocol,
+    listen_address,
+    listen_port,
+    config,
+    server_name,
+    threads,
+    backlog,
+    shard_count,
+    shard_index,
+    verbose,
+    quiet,
+):
     setup_logging(verbose - quiet)
     LOG.info("Listening on %s:%d", listen_address, listen_port)
-    config_data = load_config(config)
-    targets_config = config_data.get("targets", {}) if config_data else {}
+    config_data = load_config(config) or {}
+    targets_config = config_data.get("targets", {})
 
     if host:
         targets_config[name or host] = {"host": host, "protocol": protocol}
@@ -69,12 +129,49 @@ def main(host, name, protocol, listen_address, listen_port, config, verbose, qui
         LOG.error("No targets specified. Please specify at least one target.")
         sys.exit(1)
 
-    source = readings_source.from_config(targets_config)
+    source = readings_source.from_config(
+        targets_config,
+        engine=config_data.get("engine", "threads"),
+        max_concurrency=config_data.get("max_concurrency"),
+        poll_interval=config_data.get("poll_interval"),
+        max_staleness=config_data.get("max_staleness"),
+        failure_threshold=config_data.get("failure_threshold"),
+        backoff=config_data.get("backoff", circuit_breaker.DEFAULT_BACKOFF),
+        max_backoff=config_data.get("max_backoff", circuit_breaker.DEFAULT_MAX_BACKOFF),
+        shard_count=shard_count,
+        shard_index=shard_index,
+    )
     if source is None:
         LOG.error("Failed to set up the readings source.")
         sys.exit(1)
 
-    app.create_app(source).run(host=listen_address, port=listen_port)
+    cache_ttl = config_data.get("cache_ttl")
+    if cache_ttl:
+        source = readings_cache.CachedReadingsSource(source, ttl=cache_ttl)
+
+    cache_exposition = config_data.get("cache_exposition", False)
+    scrape_timeout_margin = config_data.get(
+        "scrape_timeout_margin", deadline.DEFAULT_SAFETY_MARGIN
+    )
+    if server_name == "flask":
+        app.create_app(
+            source,
+            cache_exposition=cache_exposition,
+            scrape_timeout_margin=scrape_timeout_margin,
+        ).run(host=listen_address, port=listen_port)
+        return
+
+    create_app = (
+        app.create_metrics_app if server_name == "prometheus" else app.create_app
+    )
+    wsgi_app = create_app(
+        source,
+        cache_exposition=cache_exposition,
+        scrape_timeout_margin=scrape_timeout_margin,
+    )
+    server.serve(
+        wsgi_app, listen_address, listen_port, threads=threads, backlog=backlog
+    )
 
 
 def setup_logging(verbosity_level: int) -> None:
@@ -1,151 +1,214 @@
-import itertools
 import logging
+import time
 from collections import defaultdict
-from collections.abc import Iterable
 
+import prometheus_client
 import prometheus_client.core
 from prometheus_client import Metric, registry
+from prometheus_client.samples import Sample
 
-from py_air_control_exporter import fetchers_api, readings_source
+from py_air_control_exporter import fetchers_api, instrumentation, readings_source
 
 LOG = logging.getLogger(__name__)
 
 
+def create_registry(
+    readings_source: readings_source.ReadingsSource,
+) -> prometheus_client.CollectorRegistry:
+    """Create a registry with all metrics for the readings of the given source.
+
+    Readings sources that have a `collect` method export their own metrics too.
+    """
+    metrics_collector_registry = prometheus_client.CollectorRegistry(auto_describe=True)
+    metrics_collector_registry.register(PyAirControlCollector(readings_source))
+    metrics_collector_registry.register(instrumentation.SelfMetricsCollector())
+    if hasattr(readings_source, "collect"):
+        metrics_collector_registry.register(readings_source)
+    return metrics_collector_registry
+
+
 class PyAirControlCollector(registry.Collector):
+    """Exports the readings of a readings source as metrics.
+
+    Samples are built in a single pass over the readings. The samples of a target are
+    rebuilt only when its reading changes, so collecting mostly costs copying samples
+    of unchanged targets.
+    """
+
     def __init__(self, readings_source: readings_source.ReadingsSource):
         self._readings_source = readings_source
         self._error_counters = defaultdict(int)
+        # The latest reading of each target and its samples by metric family name
+        self._target_samples: dict[
+            str, tuple[fetchers_api.TargetReading, dict[str, list[Sample]]]
+        ] = {}
 
     def collect(self):
         target_readings = self._readings_source()
+        sampling_error = _sampling_error_family()
+        reading_families = _reading_families()
+        reading_age = _reading_age_family()
 
-        return itertools.chain(
-            self._sampling_error(target_readings),
-            self._air_quality_metrics(target_readings),
-            self._control_info_metrics(target_readings),
-            self._get_filters_metrics(target_readings),
-        )
-
-    def _sampling_error(
-        self, target_readings: dict[str, fetchers_api.TargetReading]
-    ) -> Iterable[Metric]:
-        sampling_error = prometheus_client.core.CounterMetricFamily(
-            "py_air_control_sampling_error",
-            "Counts the number of times sampling air quality metrics failed.",
-            labels=["host", "name"],
-        )
+        now = time.time()
         for name, target_reading in target_readings.items():
             if target_reading.has_errors:
                 self._error_counters[name] += 1
-            sampling_error.add_metric(
-                [target_reading.host, name], self._error_counters[name]
-            )
-        return [sampling_error]
-
-    def _air_quality_metrics(
-        self, target_readings: dict[str, fetchers_api.TargetReading]
-    ) -> Iterable[Metric]:
-        iaql = prometheus_client.core.GaugeMetricFamily(
+            label_values = (target_reading.host, name)
+            sampling_error.add_metric(label_values, self._error_counters[name])
+
+            samples = self._get_target_samples(name, target_reading)
+            for family in reading_families:
+                family.samples.extend(samples[family.name])
+
+            if target_reading.fetched_at is not None:
+                reading_age.add_metric(
+                    label_values, max(0.0, now - target_reading.fetched_at)
+                )
+
+        if len(self._target_samples) > len(target_readings):
+            self._target_samples = {
+                name: samples
+                for name, samples in self._target_samples.items()
+                if name in target_readings
+            }
+
+        return [sampling_error, *reading_families, reading_age]
+
+    def _get_target_samples(
+        self, name: str, target_reading: fetchers_api.TargetReading
+    ) -> dict[str, list[Sample]]:
+        cached = self._target_samples.get(name)
+        if cached is not None and cached[0] == target_reading:
+            return cached[1]
+
+        families = _reading_families()
+        label_values = (target_reading.host, name)
+        iaql, pm25, is_manual, is_on, speed, filter_hours = families
+        _add_air_quality_metrics(name, target_reading, label_values, iaql, pm25)
+        _add_control_info_metrics(
+            name, target_reading, label_values, is_manual, is_on, speed
+        )
+        _add_filters_metrics(name, target_reading, label_values, filter_hours)
+
+        samples = {family.name: family.samples for family in families}
+        self._target_samples[name] = (target_reading, samples)
+        return samples
+
+
+def _sampling_error_family() -> Metric:
+    return prometheus_client.core.CounterMetricFamily(
+        "py_air_control_sampling_error",
+        "Counts the number of times sampling air quality metrics failed.",
+        labels=["host", "name"],
+    )
+
+
+def _reading_families() -> list[Metric]:
+    return [
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_air_quality",
             "IAI allergen index from 1 to 12, where 1 indicates best air quality.",
             labels=["host", "name"],
-        )
-
-        pm25 = prometheus_client.core.GaugeMetricFamily(
+        ),
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_pm25",
             "Micrograms of PM2.5 particles per cubic metre.",
             labels=["host", "name"],
-        )
-
-        for name, target_reading in target_readings.items():
-            air_quality = target_reading.air_quality
-            if air_quality is None:
-                LOG.info("No air quality information from air quality host '%s'.", name)
-                continue
-
-            LOG.debug(
-                "Got the following air quality information from host '%s': %s",
-                target_reading.host,
-                air_quality,
-            )
-            iaql.add_metric([target_reading.host, name], air_quality.iaql)
-            pm25.add_metric([target_reading.host, name], air_quality.pm25)
-
-        return [iaql, pm25]
-
-    def _control_info_metrics(
-        self, target_readings: dict[str, fetchers_api.TargetReading]
-    ) -> Iterable[Metric]:
-        is_manual = prometheus_client.core.GaugeMetricFamily(
+        ),
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_is_manual",
             "Value '1' indicates manual mode while value '0' indicates automatic mode.",
             labels=["host", "name"],
-        )
-
-        is_on = prometheus_client.core.GaugeMetricFamily(
+        ),
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_is_on",
             "Value '1' indicates that the air purifier is turned on while value "
             "'0' indicates it's turned off.",
             labels=["host", "name"],
-        )
-
-        speed = prometheus_client.core.GaugeMetricFamily(
+        ),
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_speed",
             "The fan speed setting (0 is sleep, 1-3 correspond to level settings, "
             "and 4 stands for 'turbo').",
             labels=["host", "name"],
-        )
-
-        for name, target_reading in target_readings.items():
-            control_info = target_reading.control_info
-            if control_info is None:
-                LOG.info("No control info for air quality host '%s'.", name)
-                continue
-
-            LOG.debug(
-                "Got the following control info from host '%s': %s",
-                target_reading.host,
-                control_info,
-            )
-            is_manual.add_metric(
-                [target_reading.host, name], 1 if control_info.is_manual else 0
-            )
-            is_on.add_metric(
-                [target_reading.host, name], 1 if control_info.is_on else 0
-            )
-            speed.add_metric([target_reading.host, name], control_info.fan_speed)
-
-        return [is_manual, is_on, speed]
-
-    def _get_filters_metrics(
-        self, target_readings: dict[str, fetchers_api.TargetReading]
-    ) -> Iterable[Metric]:
-        filter_metric_family = prometheus_client.core.GaugeMetricFamily(
+        ),
+        prometheus_client.core.GaugeMetricFamily(
             "py_air_control_filter_hours",
             "The number of values left before the filter has to be replaced or cleaned",
             labels=["host", "name", "id", "type"],
+        ),
+    ]
+
+
+def _reading_age_family() -> Metric:
+    return prometheus_client.core.GaugeMetricFamily(
+        "py_air_control_reading_age_seconds",
+        "Seconds since the exported reading was fetched from the air purifier.",
+        labels=["host", "name"],
+    )
+
+
+def _add_air_quality_metrics(
+    name: str,
+    target_reading: fetchers_api.TargetReading,
+    label_values: tuple[str, str],
+    iaql: Metric,
+    pm25: Metric,
+) -> None:
+    air_quality = target_reading.air_quality
+    if air_quality is None:
+        LOG.info("No air quality information from air quality host '%s'.", name)
+        return
+
+    LOG.debug(
+        "Got the following air quality information from host '%s': %s",
+        target_reading.host,
+        air_quality,
+    )
+    iaql.add_metric(label_values, air_quality.iaql)
+    pm25.add_metric(label_values, air_quality.pm25)
+
+
+def _add_control_info_metrics(  # noqa: PLR0913
+    name: str,
+    target_reading: fetchers_api.TargetReading,
+    label_values: tuple[str, str],
+    is_manual: Metric,
+    is_on: Metric,
+    speed: Metric,
+) -> None:
+    control_info = target_reading.control_info
+    if control_info is None:
+        LOG.info("No control info for air quality host '%s'.", name)
+        return
+
+    LOG.debug(
+        "Got the following control info from host '%s': %s",
+        target_reading.host,
+        control_info,
+    )
+    is_manual.add_metric(label_values, 1 if control_info.is_manual else 0)
+    is_on.add_metric(label_values, 1 if control_info.is_on else 0)
+    speed.add_metric(label_values, control_info.fan_speed)
+
+
+def _add_filters_metrics(
+    name: str,
+    target_reading: fetchers_api.TargetReading,
+    label_values: tuple[str, str],
+    filter_hours: Metric,
+) -> None:
+    filters = target_reading.filters
+    if filters is None:
+        LOG.info("No filter information for air quality host '%s'.", name)
+        return
+
+    LOG.debug(
+        "Got the following filters for host '%s': %s",
+        target_reading.host,
+        filters,
+    )
+    for filter_id, filter_info in filters.items():
+        filter_hours.add_metric(
+            [*label_values, filter_id, filter_info.filter_type], filter_info.hours
         )
-
-        for name, target_reading in target_readings.items():
-            filters = target_reading.filters
-            if filters is None:
-                LOG.info("No filter information for air quality host '%s'.", name)
-                continue
-
-            LOG.debug(
-                "Got the following filters for host '%s': %s",
-                target_reading.host,
-                filters,
-            )
-            for filter_id, filter_info in filters.items():
-                filter_metric_family.add_metric(
-                    [
-                        target_reading.host,
-                        name,
-                        filter_id,
-                        filter_info.filter_type,
-                    ],
-                    filter_info.hours,
-                )
-
-        return [filter_metric_family]
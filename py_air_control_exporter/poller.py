@@ -0,0 +1,102 @@
+import dataclasses
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from py_air_control_exporter import fetchers_api
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PolledTarget:
+    fetcher: fetchers_api.Fetcher
+    poll_interval: float  # Seconds between the end of one poll and the next
+
+
+class Poller:
+    """A readings source that polls targets in a background thread.
+
+    Calling the poller returns the latest snapshot of readings without doing any
+    device I/O. Readings older than `max_staleness` seconds are reported as errors.
+    """
+
+    def __init__(
+        self,
+        targets: dict[str, PolledTarget],
+        *,
+        max_concurrency: int | None = None,
+        max_staleness: float | None = None,
+    ):
+        self._targets = targets
+        self._max_staleness = max_staleness
+        self._readings: dict[str, fetchers_api.TargetReading] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency or 1, len(targets))),
+            thread_name_prefix="poller",
+        )
+        self._condition = threading.Condition()
+        self._stopped = False
+        now = time.monotonic()
+        self._schedule = [(now, name) for name in targets]
+        heapq.heapify(self._schedule)
+        self._thread = threading.Thread(
+            target=self._run, name="poller-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self) -> dict[str, fetchers_api.TargetReading]:
+        readings = self._readings
+        if self._max_staleness is None:
+            return readings
+        oldest_allowed = time.time() - self._max_staleness
+        stale = {
+            name: fetchers_api.TargetReading(
+                host=reading.host, has_errors=True, fetched_at=reading.fetched_at
+            )
+            for name, reading in readings.items()
+            if reading.fetched_at is not None and reading.fetched_at < oldest_allowed
+        }
+        return {**readings, **stale} if stale else readings
+
+    def close(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self) -> None:
+        with self._condition:
+            while not self._stopped:
+                if not self._schedule:
+                    self._condition.wait()
+                    continue
+                due, name = self._schedule[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._schedule)
+                self._executor.submit(self._poll, name)
+
+    def _poll(self, name: str) -> None:
+        target = self._targets[name]
+        reading = None
+        try:
+            reading = target.fetcher()
+        except Exception:
+            LOG.exception("Polling target '%s' failed unexpectedly.", name)
+        with self._condition:
+            if reading is not None:
+                reading = dataclasses.replace(reading, fetched_at=time.time())
+                # Replace rather than mutate the snapshot so that callers can keep
+                # using a snapshot they already hold.
+                self._readings = {**self._readings, name: reading}
+            heapq.heappush(
+                self._schedule, (time.monotonic() + target.poll_interval, name)
+            )
+            self._condition.notify()
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import prometheus_client.core
+from prometheus_client import registry
+
+from py_air_control_exporter import fetchers_api, readings_source
+
+
+class CachedReadingsSource(registry.Collector):
+    """A readings source that caches readings of another source for `ttl` seconds.
+
+    Callers that arrive while the readings are being fetched wait for that fetch
+    instead of starting a new one.
+    """
+
+    def __init__(self, source: readings_source.ReadingsSource, ttl: float):
+        self._source = source
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._readings: dict[str, fetchers_api.TargetReading] | None = None
+        self._expires_at = 0.0
+        self._in_flight: Future | None = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __call__(self) -> dict[str, fetchers_api.TargetReading]:
+        with self._lock:
+            if self._readings is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._readings
+            in_flight = self._in_flight
+            is_leader = in_flight is None
+            if in_flight is None:
+                self.misses += 1
+                in_flight = self._in_flight = Future()
+            else:
+                self.coalesced += 1
+
+        if is_leader:
+            return self._fetch(in_flight)
+        return in_flight.result()
+
+    def _fetch(self, in_flight: Future) -> dict[str, fetchers_api.TargetReading]:
+        try:
+            readings = self._source()
+        except BaseException as ex:
+            with self._lock:
+                self._in_flight = None
+            in_flight.set_exception(ex)
+            raise
+
+        with self._lock:
+            self._readings = readings
+            self._expires_at = time.monotonic() + self._ttl
+            self._in_flight = None
+        in_flight.set_result(readings)
+        return readings
+
+    def collect(self):
+        requests = prometheus_client.core.CounterMetricFamily(
+            "py_air_control_exporter_readings_cache_requests",
+            "Counts requests for readings by whether they were served from the cache "
+            "('hit'), fetched ('miss'), or waited for an ongoing fetch ('coalesced').",
+            labels=["result"],
+        )
+        requests.add_metric(["hit"], self.hits)
+        requests.add_metric(["miss"], self.misses)
+        requests.add_metric(["coalesced"], self.coalesced)
+        yield requests
+        if hasattr(self._source, "collect"):
+            yield from self._source.collect()
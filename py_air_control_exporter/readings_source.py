@@ -1,53 +1,258 @@
 import logging
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import cast
 
-from py_air_control_exporter import fetcher_registry, fetchers_api
+from py_air_control_exporter import (
+    async_readings_source,
+    circuit_breaker,
+    deadline,
+    fetcher_registry,
+    fetchers_api,
+    instrumentation,
+    poller,
+    sharding,
+)
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_POLL_INTERVAL = 15.0
+DEFAULT_TIMEOUT = 10.0
+
+ENGINES = ("threads", "asyncio")
+
+# Target config keys that are handled here rather than by fetchers
+_NON_FETCHER_OPTIONS = frozenset(["host", "protocol", "poll_interval"])
+
 ReadingsSource = Callable[[], dict[str, fetchers_api.TargetReading]]
 
 
 @dataclass(frozen=True)
 class _Target:
     host: str
-    fetcher: fetchers_api.Fetcher
+    fetcher: fetchers_api.Fetcher | fetchers_api.AsyncFetcher
+    poll_interval: float | None = None
+    timeout: float = DEFAULT_TIMEOUT
+
+
+@dataclass(frozen=True)
+class _BreakerConfig:
+    failure_threshold: int
+    backoff: float
+    max_backoff: float
+
+    def create_breaker(self) -> circuit_breaker.CircuitBreaker:
+        return circuit_breaker.CircuitBreaker(
+            self.failure_threshold, backoff=self.backoff, max_backoff=self.max_backoff
+        )
+
+
+def from_config(  # noqa: PLR0913
+    targets_config: dict[str, dict],
+    *,
+    engine: str = "threads",
+    max_concurrency: int | None = None,
+    poll_interval: float | None = None,
+    max_staleness: float | None = None,
+    failure_threshold: int | None = None,
+    backoff: float = circuit_breaker.DEFAULT_BACKOFF,
+    max_backoff: float = circuit_breaker.DEFAULT_MAX_BACKOFF,
+    shard_count: int = 1,
+    shard_index: int = 0,
+) -> ReadingsSource | None:
+    """Create a readings source for the given targets.
+
+    If `poll_interval` is given either here or in any of the targets, the targets are
+    polled in the background and the returned source serves the latest readings.
+    Otherwise, every call of the source fetches readings from all targets with the
+    given engine: either with a pool of `max_concurrency` threads or with asyncio.
 
+    If `failure_threshold` is given, targets that fail that many times in a row are
+    skipped for `backoff` seconds, doubling up to `max_backoff` while they keep failing.
 
-def from_config(targets_config: dict[str, dict]) -> ReadingsSource | None:
-    targets = _create_targets(targets_config)
+    With `shard_count` above 1, only the targets in shard `shard_index` are fetched, so
+    that multiple exporters can share the same config.
+    """
+    if engine not in ENGINES:
+        LOG.error("Unknown engine '%s'. Known engines: %s", engine, ", ".join(ENGINES))
+        return None
+    targets_config = _select_shard(targets_config, shard_count, shard_index)
+    if not targets_config:
+        return None
+    is_polling = poll_interval is not None or any(
+        "poll_interval" in target_config for target_config in targets_config.values()
+    )
+    is_async = engine == "asyncio" and not is_polling
+    if engine == "asyncio" and is_polling:
+        LOG.warning("Targets polled in the background are fetched with threads.")
+
+    breaker_config = None
+    if failure_threshold:
+        breaker_config = _BreakerConfig(failure_threshold, backoff, max_backoff)
+    targets = _create_targets(
+        targets_config, poll_interval, is_async=is_async, breaker_config=breaker_config
+    )
     if not targets:
         return None
-    return _create_readings_source(targets)
+    if is_polling:
+        return _create_poller(
+            targets, max_concurrency=max_concurrency, max_staleness=max_staleness
+        )
+    if is_async:
+        return _create_async_readings_source(targets, max_concurrency=max_concurrency)
+    return _create_readings_source(targets, max_concurrency=max_concurrency)
+
+
+def _select_shard(
+    targets_config: dict[str, dict], shard_count: int, shard_index: int
+) -> dict[str, dict]:
+    if not 0 <= shard_index < shard_count:
+        LOG.error(
+            "Shard index %d must be at least 0 and below the shard count %d.",
+            shard_index,
+            shard_count,
+        )
+        return {}
+    shard_targets_config = sharding.select_shard(
+        targets_config, shard_count, shard_index
+    )
+    if not shard_targets_config:
+        LOG.error(
+            "Shard %d of %d has none of the %d targets.",
+            shard_index,
+            shard_count,
+            len(targets_config),
+        )
+    return shard_targets_config
 
 
 def _create_readings_source(
     targets: dict[str, _Target],
+    max_concurrency: int | None = None,
 ) -> ReadingsSource:
+    """Create a readings source that fetches all targets on every call.
+
+    Targets that have not returned a reading by the deadline of the current scrape
+    are reported with their last good reading, or as errors. Sequential fetches
+    cannot be interrupted, so only the targets after the deadline are skipped.
+    """
+    if max_concurrency is None or max_concurrency <= 1:
+        return _create_sequential_readings_source(targets)
+    return _create_concurrent_readings_source(targets, max_concurrency)
+
+
+def _create_sequential_readings_source(targets: dict[str, _Target]) -> ReadingsSource:
+    last_good = deadline.LastGoodReadings()
+
     def _fetch() -> dict[str, fetchers_api.TargetReading]:
-        return {name: target.fetcher() for name, target in targets.items()}
+        readings = {}
+        for name, target in targets.items():
+            if deadline.remaining() == 0:
+                readings[name] = last_good.late(name, target.host)
+                continue
+            readings[name] = target.fetcher()
+            last_good.record(name, readings[name])
+        return readings
 
     return _fetch
 
 
+def _create_concurrent_readings_source(
+    targets: dict[str, _Target], max_concurrency: int
+) -> ReadingsSource:
+    last_good = deadline.LastGoodReadings()
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_concurrency, len(targets)),
+        thread_name_prefix="readings-source",
+    )
+    # Fetches that outlive a deadline are reused by the next call
+    in_flight: dict[str, Future[fetchers_api.TargetReading]] = {}
+
+    def _fetch_concurrently() -> dict[str, fetchers_api.TargetReading]:
+        futures = {}
+        for name, target in targets.items():
+            future = in_flight.get(name)
+            if future is None or future.done():
+                future = in_flight[name] = executor.submit(target.fetcher)
+            futures[name] = future
+
+        readings = {}
+        for name, future in futures.items():
+            try:
+                readings[name] = future.result(timeout=deadline.remaining())
+            except TimeoutError:
+                readings[name] = last_good.late(name, targets[name].host)
+            else:
+                last_good.record(name, readings[name])
+        return readings
+
+    return _fetch_concurrently
+
+
+def _create_async_readings_source(
+    targets: dict[str, _Target],
+    max_concurrency: int | None = None,
+) -> async_readings_source.AsyncReadingsSource:
+    return async_readings_source.AsyncReadingsSource(
+        {
+            name: async_readings_source.AsyncTarget(
+                host=target.host,
+                fetcher=cast("fetchers_api.AsyncFetcher", target.fetcher),
+                timeout=target.timeout,
+            )
+            for name, target in targets.items()
+        },
+        max_concurrency=max_concurrency,
+    )
+
+
+def _create_poller(
+    targets: dict[str, _Target],
+    max_concurrency: int | None = None,
+    max_staleness: float | None = None,
+) -> poller.Poller:
+    return poller.Poller(
+        {
+            name: poller.PolledTarget(
+                fetcher=cast("fetchers_api.Fetcher", target.fetcher),
+                poll_interval=target.poll_interval or DEFAULT_POLL_INTERVAL,
+            )
+            for name, target in targets.items()
+        },
+        max_concurrency=max_concurrency,
+        max_staleness=max_staleness,
+    )
+
+
 def _create_targets(
     targets_config: dict[str, dict],
+    default_poll_interval: float | None = None,
+    *,
+    is_async: bool = False,
+    breaker_config: _BreakerConfig | None = None,
 ) -> dict[str, _Target] | None:
+    create_fetcher = (
+        _create_instrumented_async_fetcher if is_async else _create_instrumented_fetcher
+    )
     targets = {}
 
     for name, target_config in targets_config.items():
         fetcher_config = fetchers_api.FetcherCreatorArgs(
             target_host=target_config["host"],
             target_name=name,
+            options={
+                key: value
+                for key, value in target_config.items()
+                if key not in _NON_FETCHER_OPTIONS
+            },
         )
         protocol = target_config["protocol"]
 
+        breaker = breaker_config.create_breaker() if breaker_config else None
+
         try:
-            targets[name] = _Target(
-                host=fetcher_config.target_host,
-                fetcher=fetcher_registry.create_fetcher(protocol, fetcher_config),
-            )
+            fetcher = create_fetcher(name, protocol, fetcher_config, breaker)
         except fetcher_registry.UnknownProtocolError:
             LOG.error(
                 "Unknown protocol '%s' for target '%s'. Known protocols: %s",
@@ -57,4 +262,47 @@ def _create_targets(
             )
             return None
 
+        targets[name] = _Target(
+            host=fetcher_config.target_host,
+            fetcher=fetcher,
+            poll_interval=target_config.get("poll_interval", default_poll_interval),
+            timeout=target_config.get("timeout", DEFAULT_TIMEOUT),
+        )
+
     return targets
+
+
+def _create_instrumented_fetcher(
+    name: str,
+    protocol: str,
+    fetcher_config: fetchers_api.FetcherCreatorArgs,
+    breaker: circuit_breaker.CircuitBreaker | None = None,
+) -> fetchers_api.Fetcher:
+    fetcher = instrumentation.instrument_fetcher(
+        name,
+        fetcher_config.target_host,
+        fetcher_registry.create_fetcher(protocol, fetcher_config),
+    )
+    if breaker is None:
+        return fetcher
+    return circuit_breaker.protect_fetcher(
+        name, fetcher_config.target_host, fetcher, breaker
+    )
+
+
+def _create_instrumented_async_fetcher(
+    name: str,
+    protocol: str,
+    fetcher_config: fetchers_api.FetcherCreatorArgs,
+    breaker: circuit_breaker.CircuitBreaker | None = None,
+) -> fetchers_api.AsyncFetcher:
+    fetcher = instrumentation.instrument_async_fetcher(
+        name,
+        fetcher_config.target_host,
+        fetcher_registry.create_async_fetcher(protocol, fetcher_config),
+    )
+    if breaker is None:
+        return fetcher
+    return circuit_breaker.protect_async_fetcher(
+        name, fetcher_config.target_host, fetcher, breaker
+    )
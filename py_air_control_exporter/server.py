@@ -0,0 +1,68 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+from wsgiref.types import WSGIApplication
+
+LOG = logging.getLogger(__name__)
+
+# The `flask` server is Flask's development server, the other two are served by
+# `ThreadPoolWSGIServer`. The `prometheus` server serves only the metrics and does not
+# use Flask.
+SERVERS = ("flask", "threaded", "prometheus")
+
+
+class ThreadPoolWSGIServer(WSGIServer):
+    """A WSGI server that handles requests in a bounded pool of threads.
+
+    Connections that arrive while all threads are busy wait in a queue. Once the queue
+    holds `backlog` connections, the operating system refuses further connections.
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        app: WSGIApplication,
+        *,
+        threads: int,
+        backlog: int,
+    ):
+        self.request_queue_size = backlog
+        super().__init__(server_address, _RequestHandler)
+        self.set_app(app)
+        self._executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="wsgi-server"
+        )
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process_request, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve(
+    app: WSGIApplication,
+    host: str,
+    port: int,
+    *,
+    threads: int,
+    backlog: int,
+) -> None:
+    with ThreadPoolWSGIServer(
+        (host, port), app, threads=threads, backlog=backlog
+    ) as server:
+        server.serve_forever()
+
+
+class _RequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):  # noqa: A002
+        LOG.debug("%s - %s", self.address_string(), format % args)
@@ -0,0 +1,29 @@
+import hashlib
+
+
+def shard_of(name: str, shard_count: int) -> int:
+    """Return the index of the shard that a target belongs to.
+
+    Targets are assigned with rendezvous hashing: each target goes to the shard with
+    the highest hash of the target's name and the shard's index. The hash is stable
+    across processes, and adding a shard moves only the targets that the new shard
+    wins, about 1 in `shard_count` targets.
+    """
+    return max(range(shard_count), key=lambda index: _score(name, index))
+
+
+def select_shard(
+    targets_config: dict[str, dict], shard_count: int, shard_index: int
+) -> dict[str, dict]:
+    """Return the targets that belong to shard `shard_index` of `shard_count`."""
+    if shard_count == 1:
+        return targets_config
+    return {
+        name: target_config
+        for name, target_config in targets_config.items()
+        if shard_of(name, shard_count) == shard_index
+    }
+
+
+def _score(name: str, index: int) -> bytes:
+    return hashlib.blake2b(f"{index}:{name}".encode(), digest_size=8).digest()
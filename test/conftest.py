@@ -2,10 +2,10 @@ from collections.abc import Iterable
 from unittest import mock
 
 import pytest
-from flask.testing import FlaskClient
 from prometheus_client import Metric
 from prometheus_client.parser import text_string_to_metric_families
 from prometheus_client.samples import Sample
+from werkzeug.test import Client
 
 from py_air_control_exporter import fetchers_api, readings_source
 
@@ -25,11 +25,20 @@ SOME_READINGS = {
 }
 
 
-def get_samples(client: FlaskClient) -> list[Sample]:
+def get_samples(client: Client) -> list[Sample]:
     actual_metrics = _response_to_metrics(client.get("/metrics"))
     return [sample for metric in actual_metrics for sample in metric.samples]
 
 
+def get_reading_samples(client: Client) -> list[Sample]:
+    """Get the samples of all metrics except the ones about the exporter itself"""
+    return [
+        sample
+        for sample in get_samples(client)
+        if not sample.name.startswith("py_air_control_exporter_")
+    ]
+
+
 def _response_to_metrics(response) -> Iterable[Metric]:
     return text_string_to_metric_families(response.data.decode("utf-8"))
 
@@ -1,10 +1,15 @@
+import asyncio
+import contextlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from py_air_control_exporter import fetchers_api
 from py_air_control_exporter.fetchers import http_philips
 from test import status_responses
+from test.philips_device import FakePhilipsDevice
 
 
 def test_metrics_pyairctrl_failure(mock_http_client, caplog):
@@ -33,6 +38,111 @@ def test_get_reading():
     )
 
 
+def test_session_reuses_key_and_connections(device):
+    """Readings from a device reuse the session key and HTTP connections"""
+    fetcher = http_philips.create_fetcher(_fetcher_args(device))
+    for _ in range(5):
+        assert fetcher().air_quality == fetchers_api.AirQuality(iaql=1, pm25=2)
+    assert device.handshakes == 1
+    # Status and filters are requested in parallel on separate connections
+    assert device.connections <= 2
+    assert device.requests == 10
+
+
+def test_session_rekeys_after_decryption_failure(device):
+    """A new key is exchanged when the device starts using a different key"""
+    fetcher = http_philips.create_fetcher(_fetcher_args(device))
+    assert not fetcher().has_errors
+    device.session_key = bytes(16)
+    assert not fetcher().has_errors
+    assert device.handshakes == 2
+
+
+def test_session_key_lifetime(device, mocker):
+    """A new key is exchanged when the key lifetime runs out"""
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    fetcher = http_philips.create_fetcher(_fetcher_args(device, key_lifetime=60))
+    fetcher()
+    monotonic.return_value = 159.0
+    fetcher()
+    assert device.handshakes == 1
+    monotonic.return_value = 161.0
+    fetcher()
+    assert device.handshakes == 2
+
+
+def test_status_and_filters_in_parallel(device):
+    """Status and filters are requested from the device at the same time"""
+    device.barrier = threading.Barrier(2, timeout=5)
+    fetcher = http_philips.create_fetcher(_fetcher_args(device))
+    assert not fetcher().has_errors
+
+
+def test_many_devices_in_parallel():
+    """Filters requests of different devices do not wait for each other"""
+    count = 8
+    # Status and filters of all devices wait for each other at the same barrier
+    barrier = threading.Barrier(2 * count, timeout=5)
+    with contextlib.ExitStack() as stack:
+        devices = [stack.enter_context(FakePhilipsDevice()) for _ in range(count)]
+        for device in devices:
+            device.barrier = barrier
+        fetchers = [
+            http_philips.create_fetcher(_fetcher_args(device)) for device in devices
+        ]
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            readings = list(executor.map(lambda fetcher: fetcher(), fetchers))
+    assert not any(reading.has_errors for reading in readings)
+
+
+def test_filters_interval(device):
+    """Filters are requested again only after the filters interval"""
+    fetcher = http_philips.create_fetcher(_fetcher_args(device, filters_interval=3600))
+    readings = [fetcher() for _ in range(3)]
+    assert device.requests == 4
+    assert all(reading.filters == readings[0].filters for reading in readings)
+    assert readings[0].filters
+
+
+def test_async_fetcher(device):
+    """The asyncio fetcher reuses the session key and requests data in parallel"""
+    device.barrier = threading.Barrier(2, timeout=5)
+    fetcher = http_philips.create_async_fetcher(_fetcher_args(device))
+
+    async def _fetch_twice():
+        return [await fetcher(), await fetcher()]
+
+    readings = asyncio.run(_fetch_twice())
+    assert readings[0] == readings[1]
+    assert readings[0].air_quality == fetchers_api.AirQuality(iaql=1, pm25=2)
+    assert readings[0].filters is not None
+    assert readings[0].filters["1"] == fetchers_api.Filter(hours=185, filter_type="A3")
+    assert device.handshakes == 1
+
+
+def test_async_fetcher_failure(caplog):
+    """The asyncio fetcher reports unreachable devices as errors"""
+    fetcher = http_philips.create_async_fetcher(
+        fetchers_api.FetcherCreatorArgs(target_host="127.0.0.1:1", target_name="foo")
+    )
+    assert asyncio.run(fetcher()) == fetchers_api.TargetReading(
+        host="127.0.0.1:1", has_errors=True
+    )
+    assert "Could not read values from air control device" in caplog.text
+
+
+def _fetcher_args(device, **options) -> fetchers_api.FetcherCreatorArgs:
+    return fetchers_api.FetcherCreatorArgs(
+        target_host=device.host, target_name="foo", options=options
+    )
+
+
+@pytest.fixture(name="device")
+def _device():
+    with FakePhilipsDevice() as device:
+        yield device
+
+
 @pytest.fixture(autouse=True)
 def _log_level_error(caplog):
     caplog.set_level(logging.ERROR)
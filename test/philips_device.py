@@ -0,0 +1,92 @@
+import json
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Cryptodome.Cipher import AES
+from pyairctrl import http_client
+
+from test import status_responses
+
+
+class FakePhilipsDevice(ThreadingHTTPServer):
+    """An HTTP server on localhost that speaks the Philips air purifier protocol."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.session_key = os.urandom(16)
+        self.status = status_responses.SLEEP_STATUS
+        self.filters = status_responses.FILTERS
+        self.handshakes = 0
+        self.connections = 0
+        self.requests = 0
+        # If set, GET requests wait for each other at this barrier
+        self.barrier: threading.Barrier | None = None
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    @property
+    def host(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def exchange_key(self, diffie: str) -> dict:
+        self.handshakes += 1
+        b = random.getrandbits(256)
+        s = pow(int(diffie, 16), b, http_client.P)
+        s_bytes = s.to_bytes(128, byteorder="big")[:16]
+        key = AES.new(s_bytes, AES.MODE_CBC, bytes(16)).encrypt(self.session_key)
+        return {
+            "key": key.hex(),
+            "hellman": format(pow(http_client.G, b, http_client.P), "x"),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: FakePhilipsDevice
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path != "/di/v1/products/0/security":
+            self.send_error(404)
+            return
+        response = self.server.exchange_key(json.loads(body)["diffie"])
+        self._respond(json.dumps(response).encode("ascii"))
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.barrier is not None:
+            self.server.barrier.wait()
+        values = {
+            "/di/v1/products/1/air": self.server.status,
+            "/di/v1/products/1/fltsts": self.server.filters,
+        }.get(self.path)
+        if values is None:
+            self.send_error(404)
+            return
+        self._respond(http_client.encrypt(values, self.server.session_key))
+
+    def _respond(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -1,4 +1,5 @@
 from prometheus_client.samples import Sample
+from werkzeug.test import Client
 
 from py_air_control_exporter import app
 from test import conftest
@@ -58,3 +59,11 @@ def test_metrics_fetched_again(mock_readings_source):
     assert mock_readings_source.call_count == 2
     test_client.get("/metrics")
     assert mock_readings_source.call_count == 3
+
+
+def test_metrics_app_without_flask(mock_readings_source):
+    """The metrics app serves the same metrics without Flask"""
+    client = Client(app.create_metrics_app(mock_readings_source))
+    assert Sample(
+        "py_air_control_pm25", {"host": "1.2.3.4", "name": "full"}, value=5.0
+    ) in conftest.get_samples(client)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import pytest
+
+from py_air_control_exporter import async_readings_source, deadline, fetchers_api
+from test import conftest
+
+
+def test_fetches_concurrently(make_source):
+    """All targets are awaited at the same time"""
+    both_started = asyncio.Barrier(2)
+
+    async def _fetch(name):
+        async with asyncio.timeout(5):
+            await both_started.wait()
+        return conftest.SOME_READINGS[name]
+
+    source = make_source(
+        {
+            name: async_readings_source.AsyncTarget(
+                host="1.2.3.4", fetcher=lambda name=name: _fetch(name), timeout=10
+            )
+            for name in ("empty", "full")
+        }
+    )
+    assert source() == {
+        "empty": conftest.SOME_READINGS["empty"],
+        "full": conftest.SOME_READINGS["full"],
+    }
+
+
+def test_timeout(make_source, caplog):
+    """Targets that do not answer within their timeout are reported as errors"""
+
+    async def _fetch_forever():
+        await asyncio.Event().wait()
+
+    source = make_source(
+        {
+            "slow": async_readings_source.AsyncTarget(
+                host="1.2.3.4", fetcher=_fetch_forever, timeout=0.01
+            )
+        }
+    )
+    assert source() == {
+        "slow": fetchers_api.TargetReading(host="1.2.3.4", has_errors=True)
+    }
+    assert "Fetching a reading for target 'slow' timed out" in caplog.text
+
+
+def test_deadline(make_source, caplog):
+    """Targets that do not answer by the deadline are reported with their last good
+    reading"""
+    is_slow = False
+
+    async def _fetch():
+        if is_slow:
+            await asyncio.Event().wait()
+        return conftest.SOME_READINGS["full"]
+
+    source = make_source(
+        {
+            "late": async_readings_source.AsyncTarget(
+                host="1.2.3.4", fetcher=_fetch, timeout=10
+            )
+        }
+    )
+    source()
+    is_slow = True
+    with deadline.deadline_after(0.01):
+        (reading,) = source().values()
+    assert reading.air_quality == conftest.SOME_READINGS["full"].air_quality
+    assert reading.fetched_at is not None
+    assert "Target 'late' did not return a reading before the deadline." in caplog.text
+
+
+def test_sync_fetchers_run_in_executor(make_source):
+    """Synchronous fetchers adapted to asyncio do not block the event loop"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _fetch():
+        barrier.wait()
+        return conftest.SOME_READINGS["empty"]
+
+    source = make_source(
+        {
+            name: async_readings_source.AsyncTarget(
+                host="1.2.3.2",
+                fetcher=lambda: asyncio.get_running_loop().run_in_executor(
+                    None, _fetch
+                ),
+                timeout=10,
+            )
+            for name in ("foo", "bar")
+        },
+        max_concurrency=2,
+    )
+    assert source() == {
+        "foo": conftest.SOME_READINGS["empty"],
+        "bar": conftest.SOME_READINGS["empty"],
+    }
+
+
+@pytest.fixture(name="make_source")
+def _make_source():
+    sources = []
+
+    def _create(*args, **kwargs):
+        sources.append(async_readings_source.AsyncReadingsSource(*args, **kwargs))
+        return sources[-1]
+
+    yield _create
+    for source in sources:
+        source.close()
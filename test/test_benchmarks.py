@@ -0,0 +1,68 @@
+import json
+import random
+
+from benchmarks import bench_fetchers, bench_scrape, simulator
+from py_air_control_exporter import fetchers_api
+from py_air_control_exporter.fetchers import http_philips
+
+
+def test_bench_scrape(tmp_path):
+    """The scrape benchmark runs and writes its results as JSON"""
+    output = tmp_path / "results.json"
+    bench_scrape.main(
+        ["--sizes", "3", "--repeat", "1", "--failure-rate", "0.5", f"--output={output}"]
+    )
+    results = json.loads(output.read_text())
+    assert [fleet["size"] for fleet in results["fleets"]] == [3]
+    assert results["fleets"][0]["scrape_seconds"]["median"] > 0
+    assert results["fleets"][0]["memory_bytes_per_target"] > 0
+
+
+def test_bench_fetchers(tmp_path):
+    """The fetcher benchmark reuses sessions with the simulated devices after the
+    first round"""
+    output = tmp_path / "results.json"
+    bench_fetchers.main(
+        [
+            "--count",
+            "3",
+            "--rounds",
+            "3",
+            "--max-concurrency",
+            "3",
+            f"--output={output}",
+        ]
+    )
+    results = json.loads(output.read_text())
+    assert results["first_round"]["handshakes"] == 3
+    assert results["first_round"]["errors"] == 0
+    assert results["handshakes_per_round"] == 0
+    assert results["errors_per_round"] == 0
+
+
+def test_simulator_drops_requests():
+    """Requests that the simulator drops time out in the fetcher"""
+    behavior = simulator.Behavior(drop_rate=1.0)
+    with simulator.BackgroundSimulator(1, behavior) as devices:
+        fetcher = http_philips.create_fetcher(
+            fetchers_api.FetcherCreatorArgs(
+                target_host=devices.addresses[0],
+                target_name="dropped",
+                options={"timeout": 0.1},
+            )
+        )
+        assert fetcher().has_errors
+        assert devices.totals()["dropped"] >= 1
+
+
+def test_simulator_evolves_readings():
+    """Simulated devices report changing PM2.5 values and a matching iaql"""
+    device = simulator.SimulatedDevice(
+        simulator.Behavior(volatility=100.0),
+        random.Random(0),  # noqa: S311
+    )
+    statuses = [device.status() for _ in range(20)]
+    assert len({status["pm25"] for status in statuses}) > 1
+    assert all(
+        status["iaql"] == min(12, 1 + status["pm25"] // 5) for status in statuses
+    )
@@ -0,0 +1,126 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from prometheus_client.samples import Sample
+
+from py_air_control_exporter import circuit_breaker, fetchers_api, instrumentation
+
+FAILED = fetchers_api.TargetReading(host="1.2.3.4", has_errors=True)
+SUCCEEDED = fetchers_api.TargetReading(host="1.2.3.4")
+
+
+@pytest.fixture(name="monotonic")
+def _monotonic(mocker):
+    mocker.patch("random.uniform", return_value=1.0)
+    return mocker.patch("time.monotonic", return_value=1000.0)
+
+
+def test_breaker_opens_after_consecutive_failures(monotonic):
+    """The target is skipped after `failure_threshold` failures in a row"""
+    fetcher = mock.Mock(return_value=FAILED)
+    protected = circuit_breaker.protect_fetcher(
+        "dead",
+        "1.2.3.4",
+        fetcher,
+        circuit_breaker.CircuitBreaker(3, backoff=10.0),
+    )
+    for _ in range(5):
+        assert protected().has_errors
+    assert fetcher.call_count == 3
+    assert _state_sample("dead", "1.2.3.4") == circuit_breaker.State.OPEN
+
+    monotonic.return_value += 10.0
+    fetcher.return_value = SUCCEEDED
+    assert protected() == SUCCEEDED
+    assert fetcher.call_count == 4
+    assert _state_sample("dead", "1.2.3.4") == circuit_breaker.State.CLOSED
+
+
+def test_backoff_doubles_up_to_maximum(monotonic):
+    """Each failed retry doubles the backoff, up to `max_backoff`"""
+    breaker = circuit_breaker.CircuitBreaker(1, backoff=10.0, max_backoff=30.0)
+    delays = []
+    for _ in range(4):
+        assert breaker.allow()
+        delays.append(breaker.record(FAILED))
+        assert not breaker.allow()
+        monotonic.return_value += delays[-1]
+    assert delays == [10.0, 20.0, 30.0, 30.0]
+
+
+@pytest.mark.usefixtures("monotonic")
+def test_backoff_is_jittered(mocker):
+    """Backoffs are shortened by a random factor between 0.5 and 1"""
+    mocker.patch("random.uniform", return_value=0.5)
+    breaker = circuit_breaker.CircuitBreaker(1, backoff=10.0)
+    assert breaker.allow()
+    assert breaker.record(FAILED) == 5.0
+
+
+def test_half_open_allows_a_single_attempt(monotonic):
+    """While a retry is in flight, other fetches keep skipping the target"""
+    breaker = circuit_breaker.CircuitBreaker(1, backoff=10.0)
+    breaker.allow()
+    breaker.record(FAILED)
+    monotonic.return_value += 10.0
+    assert breaker.allow()
+    assert breaker.state == circuit_breaker.State.HALF_OPEN
+    assert not breaker.allow()
+
+
+@pytest.mark.usefixtures("monotonic")
+def test_protect_async_fetcher():
+    """Async fetchers are skipped while the breaker is open"""
+    calls = []
+
+    async def _fetch():
+        calls.append(None)
+        return FAILED
+
+    protected = circuit_breaker.protect_async_fetcher(
+        "dead_async", "1.2.3.5", _fetch, circuit_breaker.CircuitBreaker(1)
+    )
+    asyncio.run(protected())
+    asyncio.run(protected())
+    assert len(calls) == 1
+
+
+def _state_sample(name: str, host: str) -> float:
+    samples = [
+        sample
+        for metric in instrumentation.SelfMetricsCollector().collect()
+        for sample in metric.samples
+    ]
+    state = Sample(
+        "py_air_control_exporter_circuit_breaker_state", {"host": host, "name": name}, 0
+    )
+    (value,) = [
+        sample.value
+        for sample in samples
+        if sample.name == state.name and sample.labels == state.labels
+    ]
+    return value
+
+
+def test_cancelled_trial_reopens_breaker(monotonic):
+    """A trial fetch that is cancelled counts as a failure"""
+    is_slow = True
+
+    async def _fetch():
+        if is_slow:
+            await asyncio.Event().wait()
+        return SUCCEEDED
+
+    protected = circuit_breaker.protect_async_fetcher(
+        "cancelled", "1.2.3.4", _fetch, circuit_breaker.CircuitBreaker(1, backoff=10.0)
+    )
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            asyncio.run(asyncio.wait_for(protected(), 0.01))
+        assert _state_sample("cancelled", "1.2.3.4") == circuit_breaker.State.OPEN
+        monotonic.return_value += 20.0
+
+    is_slow = False
+    assert asyncio.run(protected()) == SUCCEEDED
+    assert _state_sample("cancelled", "1.2.3.4") == circuit_breaker.State.CLOSED
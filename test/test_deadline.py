@@ -0,0 +1,40 @@
+from py_air_control_exporter import deadline, fetchers_api
+
+
+def test_honor_scrape_timeout():
+    """The deadline is the scrape timeout minus the safety margin"""
+    remaining = []
+
+    def _app(_environ, _start_response):
+        remaining.append(deadline.remaining())
+        return [b""]
+
+    app = deadline.honor_scrape_timeout(_app, safety_margin=1.0)
+    app({"HTTP_X_PROMETHEUS_SCRAPE_TIMEOUT_SECONDS": "10"}, None)
+    app({"HTTP_X_PROMETHEUS_SCRAPE_TIMEOUT_SECONDS": "0.5"}, None)
+    app({"HTTP_X_PROMETHEUS_SCRAPE_TIMEOUT_SECONDS": "invalid"}, None)
+    app({}, None)
+    assert 8.9 < remaining[0] <= 9.0
+    assert remaining[1:] == [0.0, None, None]
+    assert deadline.remaining() is None
+
+
+def test_late_reading_without_last_good(caplog):
+    """Late targets without a previous good reading are reported as errors"""
+    last_good = deadline.LastGoodReadings()
+    last_good.record("foo", fetchers_api.TargetReading(host="1.2.3.4", has_errors=True))
+    assert last_good.late("foo", "1.2.3.4") == fetchers_api.TargetReading(
+        host="1.2.3.4", has_errors=True
+    )
+    assert "Target 'foo' did not return a reading before the deadline." in caplog.text
+
+
+def test_late_reading_with_last_good(mocker):
+    """Late targets are reported with their last good reading and its fetch time"""
+    mocker.patch("time.time", return_value=1234.0)
+    last_good = deadline.LastGoodReadings()
+    reading = fetchers_api.TargetReading(host="1.2.3.4")
+    last_good.record("foo", reading)
+    assert last_good.late("foo", "1.2.3.4") == fetchers_api.TargetReading(
+        host="1.2.3.4", fetched_at=1234.0
+    )
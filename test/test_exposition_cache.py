@@ -0,0 +1,57 @@
+import gzip
+
+from prometheus_client.samples import Sample
+from werkzeug.test import Client
+
+from py_air_control_exporter import exposition_cache
+from test import conftest
+
+_BROKEN_LABELS = {"host": "1.2.3.1", "name": "broken"}
+
+
+def test_renders_once_per_snapshot(mock_readings_source):
+    """Metrics are rendered again only when the readings snapshot changes"""
+    client = Client(exposition_cache.CachedMetricsApp(mock_readings_source))
+    first_response = client.get("/metrics")
+    assert client.get("/metrics").data == first_response.data
+    assert Sample(
+        "py_air_control_sampling_error_total", _BROKEN_LABELS, value=1.0
+    ) in conftest.get_samples(client)
+
+    mock_readings_source.return_value = dict(conftest.SOME_READINGS)
+    assert Sample(
+        "py_air_control_sampling_error_total", _BROKEN_LABELS, value=2.0
+    ) in conftest.get_samples(client)
+
+
+def test_not_modified(mock_readings_source):
+    """Clients with the current ETag get an empty response"""
+    client = Client(exposition_cache.CachedMetricsApp(mock_readings_source))
+    etag = client.get("/metrics").headers["ETag"]
+    response = client.get("/metrics", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    mock_readings_source.return_value = {}
+    response = client.get("/metrics", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_gzip(mock_readings_source):
+    """Clients that accept gzip get the gzipped rendering"""
+    client = Client(exposition_cache.CachedMetricsApp(mock_readings_source))
+    plain = client.get("/metrics")
+    gzipped = client.get("/metrics", headers={"Accept-Encoding": "gzip, deflate"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gzipped.data) == plain.data
+
+
+def test_openmetrics(mock_readings_source):
+    """Clients that accept OpenMetrics get metrics in that format"""
+    client = Client(exposition_cache.CachedMetricsApp(mock_readings_source))
+    response = client.get(
+        "/metrics", headers={"Accept": "application/openmetrics-text; version=1.0.0"}
+    )
+    assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+    assert response.data.endswith(b"# EOF\n")
@@ -0,0 +1,61 @@
+import asyncio
+
+from prometheus_client.samples import Sample
+
+from py_air_control_exporter import fetchers_api, instrumentation
+from test import conftest
+
+
+def test_instrument_fetcher(mocker):
+    """Fetches are timed and their attempt and success times are recorded"""
+    mocker.patch("time.time", return_value=1234.0)
+    fetcher = instrumentation.instrument_fetcher(
+        "instrumented", "1.2.3.4", lambda: conftest.SOME_READINGS["full"]
+    )
+    assert fetcher() == conftest.SOME_READINGS["full"]
+    samples = _self_samples()
+    labels = {"host": "1.2.3.4", "name": "instrumented"}
+    assert (
+        Sample(
+            "py_air_control_exporter_last_fetch_attempt_timestamp_seconds",
+            labels,
+            value=1234.0,
+        )
+        in samples
+    )
+    assert (
+        Sample(
+            "py_air_control_exporter_last_fetch_success_timestamp_seconds",
+            labels,
+            value=1234.0,
+        )
+        in samples
+    )
+    assert (
+        Sample("py_air_control_exporter_fetch_duration_seconds_count", labels, 1.0)
+        in samples
+    )
+
+
+def test_instrument_async_fetcher_failure():
+    """Failed fetches record an attempt but no success"""
+
+    async def _fetch():
+        return fetchers_api.TargetReading(host="1.2.3.5", has_errors=True)
+
+    fetcher = instrumentation.instrument_async_fetcher(
+        "instrumented_failure", "1.2.3.5", _fetch
+    )
+    asyncio.run(fetcher())
+    labels = {"host": "1.2.3.5", "name": "instrumented_failure"}
+    names = {sample.name for sample in _self_samples() if sample.labels == labels}
+    assert "py_air_control_exporter_last_fetch_attempt_timestamp_seconds" in names
+    assert "py_air_control_exporter_last_fetch_success_timestamp_seconds" not in names
+
+
+def _self_samples() -> list[Sample]:
+    return [
+        sample
+        for metric in instrumentation.SelfMetricsCollector().collect()
+        for sample in metric.samples
+    ]
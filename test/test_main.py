@@ -5,7 +5,7 @@ import pytest
 import yaml
 from click.testing import CliRunner
 
-from py_air_control_exporter import main
+from py_air_control_exporter import circuit_breaker, deadline, main, readings_cache
 
 
 def test_help():
@@ -47,10 +47,23 @@ def test_main(mock_create_app, mock_from_config):
     )
     assert result.exit_code == 0
     mock_from_config.assert_called_once_with(
-        {"192.168.1.123": {"host": "192.168.1.123", "protocol": "http"}}
+        {"192.168.1.123": {"host": "192.168.1.123", "protocol": "http"}},
+        engine="threads",
+        max_concurrency=None,
+        poll_interval=None,
+        max_staleness=None,
+        failure_threshold=None,
+        backoff=circuit_breaker.DEFAULT_BACKOFF,
+        max_backoff=circuit_breaker.DEFAULT_MAX_BACKOFF,
+        shard_count=1,
+        shard_index=0,
     )
     expected_targets = mock_from_config.return_value
-    mock_create_app.assert_called_once_with(expected_targets)
+    mock_create_app.assert_called_once_with(
+        expected_targets,
+        cache_exposition=False,
+        scrape_timeout_margin=deadline.DEFAULT_SAFETY_MARGIN,
+    )
     mock_create_app.return_value.run.assert_called_once_with(host="1.2.3.4", port=12345)
 
 
@@ -82,9 +95,22 @@ def test_config_file(mock_from_config, mock_create_app):
         {
             "foo": {"host": "1.2.3.4", "protocol": "http"},
             "bar": {"host": "1.2.3.5", "protocol": "http"},
-        }
+        },
+        engine="threads",
+        max_concurrency=4,
+        poll_interval=None,
+        max_staleness=None,
+        failure_threshold=None,
+        backoff=circuit_breaker.DEFAULT_BACKOFF,
+        max_backoff=circuit_breaker.DEFAULT_MAX_BACKOFF,
+        shard_count=1,
+        shard_index=0,
+    )
+    mock_create_app.assert_called_once_with(
+        mock_from_config.return_value,
+        cache_exposition=False,
+        scrape_timeout_margin=deadline.DEFAULT_SAFETY_MARGIN,
     )
-    mock_create_app.assert_called_once_with(mock_from_config.return_value)
 
 
 @pytest.mark.usefixtures("mock_create_fetcher")
@@ -94,12 +120,46 @@ def test_default_parameters(mock_create_app, mock_from_config):
     """
     result = CliRunner().invoke(main.main, ["--host=192.168.1.123", "--name=foo"])
     assert result.exit_code == 0
-    mock_create_app.assert_called_once_with(mock_from_config.return_value)
+    mock_create_app.assert_called_once_with(
+        mock_from_config.return_value,
+        cache_exposition=False,
+        scrape_timeout_margin=deadline.DEFAULT_SAFETY_MARGIN,
+    )
     mock_create_app.return_value.run.assert_called_once_with(
         host="127.0.0.1", port=9896
     )
 
 
+@pytest.mark.parametrize(
+    ("server_name", "app_factory"),
+    [("threaded", "create_app"), ("prometheus", "create_metrics_app")],
+)
+def test_server(mocker, mock_from_config, server_name, app_factory):
+    """Check that the app is served by the thread pool server when requested"""
+    mock_app_factory = mocker.patch(
+        f"py_air_control_exporter.app.{app_factory}", autospec=True
+    )
+    mock_serve = mocker.patch("py_air_control_exporter.server.serve", autospec=True)
+    result = CliRunner().invoke(
+        main.main,
+        [
+            "--host=192.168.1.123",
+            f"--server={server_name}",
+            "--threads=3",
+            "--backlog=7",
+        ],
+    )
+    assert result.exit_code == 0
+    mock_app_factory.assert_called_once_with(
+        mock_from_config.return_value,
+        cache_exposition=False,
+        scrape_timeout_margin=deadline.DEFAULT_SAFETY_MARGIN,
+    )
+    mock_serve.assert_called_once_with(
+        mock_app_factory.return_value, "127.0.0.1", 9896, threads=3, backlog=7
+    )
+
+
 @pytest.fixture(name="mock_create_app")
 def _mock_create_app(mocker):
     return mocker.patch(
@@ -123,3 +183,28 @@ def _mock_create_fetcher(mocker):
         "py_air_control_exporter.fetcher_registry.create_fetcher",
         autospec=True,
     )
+
+
+@pytest.mark.usefixtures("mock_from_config")
+def test_cache_ttl(tmp_path, mock_create_app):
+    """Check that the readings source is cached when the config has a cache TTL"""
+    config = tmp_path / "config.yaml"
+    config_content = yaml.dump(
+        {"cache_ttl": 5, "targets": {"foo": {"host": "1.2.3.4", "protocol": "http"}}}
+    )
+    config.write_text(config_content)
+    result = CliRunner().invoke(main.main, [f"--config={config}"])
+    assert result.exit_code == 0
+    source = mock_create_app.call_args.args[0]
+    assert isinstance(source, readings_cache.CachedReadingsSource)
+
+
+@pytest.mark.usefixtures("mock_create_app")
+def test_shard(mock_from_config):
+    """Check that the shard options are passed to the readings source"""
+    result = CliRunner().invoke(
+        main.main, ["--host=192.168.1.123", "--shard-count=3", "--shard-index=2"]
+    )
+    assert result.exit_code == 0
+    assert mock_from_config.call_args.kwargs["shard_count"] == 3
+    assert mock_from_config.call_args.kwargs["shard_index"] == 2
@@ -1,7 +1,7 @@
 from prometheus_client.samples import Sample
 
-from py_air_control_exporter import app, fetchers_api
-from test.conftest import get_samples
+from py_air_control_exporter import app, fetchers_api, metrics
+from test.conftest import SOME_READINGS, get_reading_samples, get_samples
 
 
 def test_metrics(mock_readings_source):
@@ -33,10 +33,54 @@ def test_metrics_no_data(mock_readings_source):
             {"host": "1.2.3.1", "name": "empty"},
             value=0.0,
         )
-    ] == get_samples(app.create_app(mock_readings_source).test_client())
+    ] == get_reading_samples(app.create_app(mock_readings_source).test_client())
 
 
 def test_metrics_empty(mock_readings_source):
     """Metrics endpoint should produce no metrics when there are no targets"""
     mock_readings_source.return_value = {}
-    assert not get_samples(app.create_app(mock_readings_source).test_client())
+    assert not get_reading_samples(app.create_app(mock_readings_source).test_client())
+
+
+def test_metrics_reading_age(mock_readings_source, mocker):
+    """Metrics endpoint should export the age of readings with a fetch time"""
+    mocker.patch("time.time", return_value=1000.0)
+    mock_readings_source.return_value = {
+        "full": fetchers_api.TargetReading(host="1.2.3.4", fetched_at=958.0)
+    }
+    assert Sample(
+        "py_air_control_reading_age_seconds",
+        {"host": "1.2.3.4", "name": "full"},
+        value=42.0,
+    ) in get_samples(app.create_app(mock_readings_source).test_client())
+
+
+def test_metrics_unchanged_readings_reused(mock_readings_source, mocker):
+    """Samples are rebuilt only for targets whose reading changed"""
+    build_samples = mocker.spy(metrics, "_add_air_quality_metrics")
+    client = app.create_app(mock_readings_source).test_client()
+    get_samples(client)
+    assert build_samples.call_count == 3
+
+    changed_reading = fetchers_api.TargetReading(
+        host="1.2.3.4", air_quality=fetchers_api.AirQuality(iaql=7, pm25=11)
+    )
+    mock_readings_source.return_value = {**SOME_READINGS, "full": changed_reading}
+    samples = get_samples(client)
+    assert build_samples.call_count == 4
+    labels = {"host": "1.2.3.4", "name": "full"}
+    assert Sample("py_air_control_pm25", labels, value=11.0) in samples
+    assert Sample("py_air_control_pm25", labels, value=5.0) not in samples
+
+
+def test_self_metrics(mock_readings_source):
+    """Metrics endpoint should export metrics about the exporter itself"""
+    client = app.create_app(mock_readings_source).test_client()
+    get_samples(client)
+    samples = get_samples(client)
+    assert Sample("py_air_control_exporter_fetches_in_flight", {}, value=0.0) in samples
+    assert any(
+        sample.name == "py_air_control_exporter_scrape_duration_seconds_count"
+        and sample.value >= 1
+        for sample in samples
+    )
@@ -0,0 +1,63 @@
+import time
+from unittest import mock
+
+import pytest
+
+from py_air_control_exporter import fetchers_api, poller
+from test import conftest
+
+
+def test_serves_polled_readings(make_poller):
+    """Readings are fetched in the background and served without calling fetchers"""
+    fetcher = mock.Mock(return_value=conftest.SOME_READINGS["full"])
+    source = make_poller({"full": poller.PolledTarget(fetcher, poll_interval=60)})
+    readings = _wait_for_readings(source)
+    assert readings["full"].air_quality == conftest.SOME_READINGS["full"].air_quality
+    assert readings["full"].fetched_at is not None
+    source()
+    assert fetcher.call_count == 1
+
+
+def test_polls_repeatedly(make_poller):
+    """Targets are polled again after their poll interval"""
+    fetcher = mock.Mock(return_value=fetchers_api.TargetReading(host="1.2.3.4"))
+    make_poller({"foo": poller.PolledTarget(fetcher, poll_interval=0.01)})
+    deadline = time.monotonic() + 5
+    while fetcher.call_count < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fetcher.call_count >= 3
+
+
+def test_stale_readings_are_errors(make_poller, mocker):
+    """Readings older than max_staleness are reported as errors"""
+    fetcher = mock.Mock(return_value=conftest.SOME_READINGS["full"])
+    source = make_poller(
+        {"full": poller.PolledTarget(fetcher, poll_interval=60)}, max_staleness=10
+    )
+    fetched_at = _wait_for_readings(source)["full"].fetched_at
+    mocker.patch("time.time", return_value=fetched_at + 11)
+    assert source() == {
+        "full": fetchers_api.TargetReading(
+            host="1.2.3.4", has_errors=True, fetched_at=fetched_at
+        )
+    }
+
+
+def _wait_for_readings(source: poller.Poller) -> dict[str, fetchers_api.TargetReading]:
+    deadline = time.monotonic() + 5
+    while not (readings := source()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return readings
+
+
+@pytest.fixture(name="make_poller")
+def _make_poller():
+    pollers = []
+
+    def _create(*args, **kwargs):
+        pollers.append(poller.Poller(*args, **kwargs))
+        return pollers[-1]
+
+    yield _create
+    for p in pollers:
+        p.close()
@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client.samples import Sample
+
+from py_air_control_exporter import app, readings_cache
+from test import conftest
+
+
+def test_cache_hit(mock_readings_source):
+    """Readings are fetched once and then served from the cache until they expire"""
+    source = readings_cache.CachedReadingsSource(mock_readings_source, ttl=60)
+    assert source() is conftest.SOME_READINGS
+    assert source() is conftest.SOME_READINGS
+    assert mock_readings_source.call_count == 1
+    assert (source.hits, source.misses, source.coalesced) == (1, 1, 0)
+
+
+def test_cache_expiry(mock_readings_source, mocker):
+    """Readings are fetched again after the TTL"""
+    monotonic = mocker.patch("time.monotonic", return_value=100.0)
+    source = readings_cache.CachedReadingsSource(mock_readings_source, ttl=10)
+    source()
+    monotonic.return_value = 111.0
+    source()
+    assert mock_readings_source.call_count == 2
+    assert source.misses == 2
+
+
+def test_coalesced_fetch(mock_readings_source):
+    """Callers arriving during an ongoing fetch wait for it instead of fetching"""
+    fetch_started = threading.Event()
+    release_fetch = threading.Event()
+
+    def _slow_fetch():
+        fetch_started.set()
+        release_fetch.wait(timeout=5)
+        return conftest.SOME_READINGS
+
+    mock_readings_source.side_effect = _slow_fetch
+    source = readings_cache.CachedReadingsSource(mock_readings_source, ttl=60)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(source)
+        fetch_started.wait(timeout=5)
+        follower = executor.submit(source)
+        while source.coalesced == 0 and not follower.done():
+            time.sleep(0.001)
+        release_fetch.set()
+        assert leader.result() is follower.result() is conftest.SOME_READINGS
+    assert mock_readings_source.call_count == 1
+    assert (source.misses, source.coalesced) == (1, 1)
+
+
+def test_fetch_error_not_cached(mock_readings_source):
+    """Failed fetches raise the error and are not cached"""
+    mock_readings_source.side_effect = [RuntimeError("foobar"), conftest.SOME_READINGS]
+    source = readings_cache.CachedReadingsSource(mock_readings_source, ttl=60)
+    with pytest.raises(RuntimeError, match="foobar"):
+        source()
+    assert source() is conftest.SOME_READINGS
+
+
+def test_cache_metrics(mock_readings_source):
+    """Metrics endpoint exports the cache request counters"""
+    source = readings_cache.CachedReadingsSource(mock_readings_source, ttl=60)
+    samples = conftest.get_samples(app.create_app(source).test_client())
+    assert (
+        Sample(
+            "py_air_control_exporter_readings_cache_requests_total",
+            {"result": "miss"},
+            value=1.0,
+        )
+        in samples
+    )
+    assert (
+        Sample(
+            "py_air_control_exporter_readings_cache_requests_total",
+            {"result": "hit"},
+            value=1.0,
+        )
+        in samples
+    )
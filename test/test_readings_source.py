@@ -1,4 +1,12 @@
-from py_air_control_exporter import readings_source
+import threading
+
+from py_air_control_exporter import (
+    async_readings_source,
+    deadline,
+    fetchers_api,
+    poller,
+    readings_source,
+)
 from test import conftest
 
 
@@ -24,3 +32,145 @@ def test_unknown_protocol_in_config(caplog):
     assert result is None
     assert "Unknown protocol 'invalid' for target 'test'" in caplog.text
     assert "Known protocols:" in caplog.text
+
+
+def test_concurrent_fetch(mocker):
+    """Check that targets are fetched concurrently when max_concurrency is above 1"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _get_reading(host, *_args):
+        barrier.wait()
+        return fetchers_api.TargetReading(host=host)
+
+    mocker.patch(
+        "py_air_control_exporter.fetchers.http_philips.get_reading",
+        autospec=True,
+        side_effect=_get_reading,
+    )
+    source = readings_source.from_config(
+        {
+            "foo": {"host": "1.2.3.4", "protocol": "http"},
+            "bar": {"host": "1.2.3.5", "protocol": "http"},
+        },
+        max_concurrency=2,
+    )
+    assert source is not None
+    assert source() == {
+        "foo": fetchers_api.TargetReading(host="1.2.3.4"),
+        "bar": fetchers_api.TargetReading(host="1.2.3.5"),
+    }
+
+
+def test_poll_interval_creates_poller(mocker):
+    """Check that a poll interval in the config makes the source poll in background"""
+    mocker.patch(
+        "py_air_control_exporter.fetchers.http_philips.get_reading",
+        autospec=True,
+        return_value=conftest.SOME_READINGS["full"],
+    )
+    source = readings_source.from_config(
+        {"foo": {"host": "1.2.3.4", "protocol": "http", "poll_interval": 60}}
+    )
+    assert isinstance(source, poller.Poller)
+    source.close()
+
+
+def test_asyncio_engine():
+    """Check that the asyncio engine creates an asyncio readings source"""
+    source = readings_source.from_config(
+        {"foo": {"host": "1.2.3.4", "protocol": "http"}}, engine="asyncio"
+    )
+    assert isinstance(source, async_readings_source.AsyncReadingsSource)
+    source.close()
+
+
+def test_unknown_engine(caplog):
+    """Check that error is logged when config contains an unknown engine"""
+    targets_config = {"test": {"host": "1.2.3.4", "protocol": "http"}}
+    assert readings_source.from_config(targets_config, engine="invalid") is None
+    assert "Unknown engine 'invalid'" in caplog.text
+
+
+def test_failure_threshold(mocker):
+    """Check that failing targets are skipped when failure_threshold is set"""
+    mock_get_reading = mocker.patch(
+        "py_air_control_exporter.fetchers.http_philips.get_reading",
+        autospec=True,
+        return_value=fetchers_api.TargetReading(host="1.2.3.4", has_errors=True),
+    )
+    source = readings_source.from_config(
+        {"foo": {"host": "1.2.3.4", "protocol": "http"}}, failure_threshold=2
+    )
+    assert source is not None
+    for _ in range(3):
+        assert source()["foo"].has_errors
+    assert mock_get_reading.call_count == 2
+
+
+def test_deadline(mocker):
+    """Check that targets that miss the deadline do not delay the other targets"""
+    release = threading.Event()
+
+    def _get_reading(host, *_args):
+        if host == "1.2.3.5":
+            release.wait(timeout=5)
+        return fetchers_api.TargetReading(host=host)
+
+    mocker.patch(
+        "py_air_control_exporter.fetchers.http_philips.get_reading",
+        autospec=True,
+        side_effect=_get_reading,
+    )
+    source = readings_source.from_config(
+        {
+            "foo": {"host": "1.2.3.4", "protocol": "http"},
+            "bar": {"host": "1.2.3.5", "protocol": "http"},
+        },
+        max_concurrency=2,
+    )
+    assert source is not None
+    with deadline.deadline_after(0.1):
+        assert source() == {
+            "foo": fetchers_api.TargetReading(host="1.2.3.4"),
+            "bar": fetchers_api.TargetReading(host="1.2.3.5", has_errors=True),
+        }
+    release.set()
+    assert source()["bar"] == fetchers_api.TargetReading(host="1.2.3.5")
+
+
+def test_shard(mocker):
+    """Check that only the targets of the given shard are fetched"""
+    mocker.patch(
+        "py_air_control_exporter.fetchers.http_philips.get_reading",
+        autospec=True,
+        side_effect=lambda host, *_args: fetchers_api.TargetReading(host=host),
+    )
+    targets_config = {
+        "foo": {"host": "1.2.3.4", "protocol": "http"},
+        "bar": {"host": "1.2.3.5", "protocol": "http"},
+    }
+    shards = [
+        readings_source.from_config(targets_config, shard_count=3, shard_index=index)
+        for index in (0, 2)
+    ]
+    assert [shard() for shard in shards if shard is not None] == [
+        {"bar": fetchers_api.TargetReading(host="1.2.3.5")},
+        {"foo": fetchers_api.TargetReading(host="1.2.3.4")},
+    ]
+
+
+def test_empty_shard(caplog):
+    """Check that an error is logged for shards without targets"""
+    targets_config = {"foo": {"host": "1.2.3.4", "protocol": "http"}}
+    assert (
+        readings_source.from_config(targets_config, shard_count=3, shard_index=0)
+        is None
+    )
+    assert "Shard 0 of 3 has none of the 1 targets." in caplog.text
+    assert (
+        readings_source.from_config(targets_config, shard_count=3, shard_index=3)
+        is None
+    )
+    assert (
+        "Shard index 3 must be at least 0 and below the shard count 3." in caplog.text
+    )
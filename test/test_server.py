@@ -0,0 +1,57 @@
+import contextlib
+import http.client
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from py_air_control_exporter import server
+
+
+def test_concurrent_requests():
+    """Requests are handled concurrently by the pool of threads"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _app(_environ, start_response):
+        barrier.wait()
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"foo"]
+
+    with _running_server(_app, threads=2) as address, ThreadPoolExecutor(2) as executor:
+        responses = list(executor.map(_get, [address, address]))
+    assert responses == [(200, b"foo"), (200, b"foo")]
+
+
+def test_app_error():
+    """Errors in the app result in an internal server error response"""
+
+    def _app(_environ, _start_response):
+        msg = "foobar"
+        raise RuntimeError(msg)
+
+    with _running_server(_app, threads=1) as address:
+        assert _get(address)[0] == 500
+
+
+def _get(address: tuple[str, int]) -> tuple[int, bytes]:
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    try:
+        connection.request("GET", "/")
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def _running_server(app, threads: int):
+    with server.ThreadPoolWSGIServer(
+        ("127.0.0.1", 0), app, threads=threads, backlog=8
+    ) as wsgi_server:
+        thread = threading.Thread(
+            target=wsgi_server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        thread.start()
+        try:
+            yield wsgi_server.server_address[:2]
+        finally:
+            wsgi_server.shutdown()
+            thread.join()
@@ -0,0 +1,31 @@
+import pytest
+
+from py_air_control_exporter import sharding
+
+NAMES = [f"purifier-{index}" for index in range(1000)]
+
+
+def test_shards_partition_targets():
+    """Every target belongs to exactly one shard"""
+    targets_config = {name: {"host": name, "protocol": "http"} for name in NAMES}
+    shards = [sharding.select_shard(targets_config, 4, index) for index in range(4)]
+    assert sorted(name for shard in shards for name in shard) == sorted(NAMES)
+    assert all(150 < len(shard) < 350 for shard in shards)
+
+
+def test_adding_a_shard_moves_few_targets():
+    """Targets move only to the new shard when a shard is added"""
+    moved = [
+        name
+        for name in NAMES
+        if sharding.shard_of(name, 4) != sharding.shard_of(name, 5)
+    ]
+    assert all(sharding.shard_of(name, 5) == 4 for name in moved)
+    assert 100 < len(moved) < 300
+
+
+@pytest.mark.parametrize(("name", "expected_shard"), [("foo", 2), ("bar", 0)])
+def test_shards_are_stable(name, expected_shard):
+    """A target's shard depends only on its name and the number of shards"""
+    assert sharding.shard_of(name, 1) == 0
+    assert sharding.shard_of(name, 3) == expected_shard